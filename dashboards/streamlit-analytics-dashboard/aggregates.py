@@ -0,0 +1,79 @@
+"""
+Aggregates
+Filtering, KPI and chart aggregates shared by the dashboard views.
+"""
+
+import pandas as pd
+
+MEASURES = ['revenue', 'profit', 'units_sold']
+
+
+def filter_mask(df: pd.DataFrame, start_date, end_date, regions=None, products=None, categories=None):
+    """Boolean mask for a date range and dimension selection (None means no restriction)"""
+    mask = pd.Series(True, index=df.index)
+
+    if start_date is not None:
+        mask &= df['date'] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df['date'] < pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+    if regions is not None:
+        mask &= df['region'].isin(regions)
+    if products is not None:
+        mask &= df['product'].isin(products)
+    if categories is not None:
+        mask &= df['category'].isin(categories)
+
+    return mask
+
+
+def apply_filters(df: pd.DataFrame, start_date, end_date, regions=None, products=None, categories=None):
+    """Rows matching a date range and dimension selection"""
+    return df[filter_mask(df, start_date, end_date, regions, products, categories)]
+
+
+def compute_kpis(filtered_df: pd.DataFrame) -> dict:
+    """Exact KPI values for a filtered frame"""
+    return {
+        'total_revenue': filtered_df['revenue'].sum(),
+        'total_profit': filtered_df['profit'].sum(),
+        'avg_margin': filtered_df['profit_margin'].mean(),
+        'total_units': filtered_df['units_sold'].sum(),
+        'transactions': len(filtered_df),
+        'avg_order': filtered_df['revenue'].mean(),
+        'units_per_order': filtered_df['units_sold'].mean()
+    }
+
+
+def compute_aggregates(filtered_df: pd.DataFrame, weight: str = None) -> dict:
+    """
+    Chart aggregates for a filtered frame.
+
+    When ``weight`` names a column, measures are multiplied by it first so a
+    weighted sample produces estimates of the full-data aggregates.
+    """
+    values = filtered_df[MEASURES]
+    if weight is not None:
+        values = values.mul(filtered_df[weight], axis=0)
+    dates = filtered_df['date']
+
+    daily_revenue = values['revenue'].groupby(dates.dt.normalize()).sum().reset_index()
+    daily_revenue.columns = ['Date', 'Revenue']
+
+    region_revenue = values['revenue'].groupby(filtered_df['region']).sum().reset_index()
+    region_revenue = region_revenue.sort_values('revenue', ascending=False)
+
+    product_stats = values[['revenue', 'units_sold']].groupby(filtered_df['product']).sum().reset_index()
+    product_stats = product_stats.sort_values('revenue', ascending=False)
+
+    category_revenue = values['revenue'].groupby(filtered_df['category']).sum().reset_index()
+
+    monthly_metrics = values.groupby(dates.dt.to_period('M').astype(str).rename('month')).sum().reset_index()
+
+    return {
+        'daily_revenue': daily_revenue,
+        'region_revenue': region_revenue,
+        'product_stats': product_stats,
+        'category_revenue': category_revenue,
+        'monthly_metrics': monthly_metrics
+    }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Dashboard API
+Headless JSON endpoint for the dashboard's filtered KPIs and chart aggregates.
+
+Results come from the same cached loaders as the Streamlit page. Each
+response body is serialized once per dataset and filter, tagged with an
+ETag, and conditional requests that still match get 304 Not Modified.
+
+Endpoints:
+    GET /api/dimensions
+    GET /api/dashboard?start_date=2024-01-01&end_date=2024-06-30&region=Europe&product=Product+A
+    GET /health
+
+Usage:
+    python api.py [--host 127.0.0.1] [--port 8502]
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import threading
+from collections import namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import loaders
+from data_layer import make_filters
+from date_index import period_kpis
+from memory import MemoryBudgetCache
+
+DEFAULT_PORT = 8502
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+# Repeatable query parameter -> load_dashboard argument
+DIMENSION_PARAMS = {'region': 'regions', 'product': 'products', 'category': 'categories'}
+
+Response = namedtuple('Response', ['etag', 'body'])
+
+
+class BadRequest(ValueError):
+    """Raised for query strings the API cannot interpret"""
+
+
+def to_jsonable(value):
+    """json.dumps fallback for pandas, numpy and date values"""
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat() if value == value.normalize() else value.isoformat()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='records')
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def without_nan(value):
+    """Replace NaN with None so the body stays valid JSON"""
+    if isinstance(value, dict):
+        return {key: without_nan(item) for key, item in value.items()}
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, np.floating) and np.isnan(value):
+        return None
+    return value
+
+
+def parse_date(value: str, name: str):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a YYYY-MM-DD date")
+
+
+def parse_query(query: str) -> tuple:
+    """
+    Normalized (start_date, end_date, regions, products, categories) for a
+    query string. Omitted dates stay None until the data range is known;
+    selections are sorted, so the same filter in any order shares one cache entry.
+    """
+    params = parse_qs(query, keep_blank_values=False)
+    unknown = set(params) - {'start_date', 'end_date'} - set(DIMENSION_PARAMS)
+    if unknown:
+        raise BadRequest(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    dates = tuple(parse_date(params[name][-1], name) if name in params else None for name in ('start_date', 'end_date'))
+    selections = tuple(tuple(sorted(set(params[param]))) if param in params else None for param in DIMENSION_PARAMS)
+    return dates + selections
+
+
+def resolve_filters(query: tuple) -> dict:
+    """Dashboard filters for a parsed query; omitted dates default to the full data range"""
+    start_date, end_date, regions, products, categories = query
+    min_date, max_date = loaders.load_dimensions()['date_bounds']
+    start_date = start_date or min_date
+    end_date = end_date or max_date
+    if end_date < start_date:
+        raise BadRequest("end_date is before start_date")
+    return make_filters(start_date, end_date, regions, products, categories)
+
+
+def dashboard_payload(filters: dict) -> dict:
+    """KPIs, comparison periods and chart aggregates, as drawn by the dashboard"""
+    arguments = {name: list(value) if isinstance(value, tuple) else value for name, value in filters.items()}
+    dashboard = loaders.load_dashboard(*arguments.values())
+
+    date_index = loaders.load_date_index()
+    index_filters = {name: arguments[name] for name in ('regions', 'products', 'categories')}
+    periods = date_index.compare(filters['start_date'], filters['end_date'], **index_filters)
+    aggregates = dict(
+        dashboard['aggregates'],
+        daily_revenue=date_index.daily_revenue(filters['start_date'], filters['end_date'], **index_filters)
+    )
+
+    return {
+        'filters': filters,
+        'kpis': without_nan(dashboard['kpis']),
+        'grand_total_revenue': dashboard['grand_total_revenue'],
+        'comparison': {
+            name: without_nan(period_kpis(periods[name])) for name in ('previous_period', 'previous_year')
+        },
+        'aggregates': aggregates
+    }
+
+
+class ResponseCache:
+    """
+    Serialized responses keyed by dataset and request.
+
+    Concurrent requests for the same uncached key wait for a single build
+    instead of each computing and serializing the same payload.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self._responses = MemoryBudgetCache(budget_bytes)
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def get(self, key, build) -> Response:
+        response = self._responses.get(key)
+        if response is not None:
+            return response
+
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                response = self._responses.get(key)
+                if response is None:
+                    body = json.dumps(build(), default=to_jsonable, separators=(',', ':')).encode('utf-8')
+                    response = Response(f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body)
+                    self._responses.put(key, response, size=len(body))
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return response
+
+    def usage(self) -> dict:
+        return self._responses.usage()
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or etag in [candidate.removeprefix('W/') for candidate in candidates]
+
+
+class DashboardRequestHandler(BaseHTTPRequestHandler):
+    """Serves the JSON endpoints; responses are cached per dataset version and query"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, keep-alive clients wait ~40 ms for each body
+    disable_nagle_algorithm = True
+    server_version = "DashboardAPI/1.0"
+    responses_cache = ResponseCache()
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool):
+        # Each connection has its own thread; without a context the shared caches are bypassed
+        loaders.attach_cache_context()
+        url = urlsplit(self.path)
+        try:
+            if url.path == '/health':
+                response = Response(None, b'{"status":"ok"}')
+            elif url.path == '/api/dimensions':
+                response = self._cached(('dimensions',), loaders.load_dimensions)
+            elif url.path == '/api/dashboard':
+                query = parse_query(url.query)
+                response = self._cached(('dashboard',) + query, lambda: dashboard_payload(resolve_filters(query)))
+            else:
+                return self._error(HTTPStatus.NOT_FOUND, f"No endpoint at {url.path}", send_body)
+        except BadRequest as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e), send_body)
+        except Exception as e:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e), send_body)
+
+        if response.etag and etag_matches(self.headers.get('If-None-Match'), response.etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response.body)))
+        if response.etag:
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(response.body)
+
+    def _cached(self, key, build) -> Response:
+        # Each load gets a new dataset version, so a reload's responses get new keys and ETags
+        return self.responses_cache.get((loaders.dataset_version(loaders.load_data()),) + key, build)
+
+    def _error(self, status, message, send_body: bool):
+        body = json.dumps({'error': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), DashboardRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Serve the API from a thread of the Streamlit server process, sharing its caches"""
+    server = make_server(host, port)
+    threading.Thread(target=server.serve_forever, name="dashboard-api", daemon=True).start()
+    print(f"🔌 Dashboard API listening on http://{host}:{port}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"🔌 Dashboard API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,22 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import os
-from supabase import create_client, Client
+import time
+from datetime import datetime
 from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import tempfile
+from aggregates import filter_mask, apply_filters, compute_aggregates, compute_kpis
+from data_layer import make_filters, filtered_key
+from sampling import estimate_kpis
+from customer_analytics import unique_customers_exact, top_customers, cohort_retention
+from memory import session_view, process_rss
+from figure_cache import render_spec
+from date_index import period_kpis
+from live import REFRESH_SECONDS, stream_seconds_from_env
+from loaders import (
+    load_data, load_dimensions, load_dashboard, load_date_index, get_memory_cache,
+    load_data_size, load_customer_sketches, load_sample, get_figure_cache, load_live_feed,
+    dataset_version
+)
 
 # Page configuration
 st.set_page_config(
@@ -50,67 +55,57 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Initialize Supabase client
-@st.cache_resource
-def init_supabase():
-    url = os.environ.get("SUPABASE_URL", "")
-    key = os.environ.get("SUPABASE_KEY", "")
-    
-    if url and key:
-        return create_client(url, key)
-    return None
-
-# Load data from Supabase or use sample data
-@st.cache_data(ttl=600)
-def load_data():
-    supabase = init_supabase()
-    
-    # Try to load from Supabase
-    if supabase:
-        try:
-            response = supabase.table('sales_data').select("*").execute()
-            if response.data:
-                df = pd.DataFrame(response.data)
-                df['date'] = pd.to_datetime(df['date'])
-                return df
-        except Exception as e:
-            st.warning(f"Using sample data. Supabase connection: {str(e)}")
-    
-    # Generate sample data if Supabase is not configured
-    return generate_sample_data()
+def create_excel_report(filtered_df, kpis):
+    """Generate a two-sheet Excel workbook (data and summary)"""
+    excel_buffer = BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+        filtered_df.to_excel(writer, sheet_name='Sales Data', index=False)
+        
+        # Add summary sheet
+        summary_df = pd.DataFrame({
+            'Metric': ['Total Revenue', 'Total Profit', 'Total Units Sold', 'Avg Order Value', 'Transactions'],
+            'Value': [
+                f"${kpis['total_revenue']:,.2f}",
+                f"${kpis['total_profit']:,.2f}",
+                f"{kpis['total_units']:,}",
+                f"${kpis['avg_order']:,.2f}",
+                f"{len(filtered_df):,}"
+            ]
+        })
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    
+    return excel_buffer.getvalue()
 
-def generate_sample_data():
-    """Generate realistic sample sales data"""
-    import numpy as np
-    
-    np.random.seed(42)
-    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
-    
-    regions = ['North America', 'Europe', 'Asia Pacific', 'Latin America', 'Middle East']
-    products = ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
-    categories = ['Electronics', 'Software', 'Services', 'Hardware', 'Accessories']
-    
-    data = []
-    for date in dates:
-        for _ in range(np.random.randint(3, 8)):
-            data.append({
-                'date': date,
-                'region': np.random.choice(regions),
-                'product': np.random.choice(products),
-                'category': np.random.choice(categories),
-                'revenue': np.random.uniform(1000, 50000),
-                'units_sold': np.random.randint(1, 100),
-                'customer_id': f'CUST-{np.random.randint(1000, 9999)}'
-            })
-    
-    df = pd.DataFrame(data)
-    df['profit_margin'] = np.random.uniform(0.15, 0.45, len(df))
-    df['profit'] = df['revenue'] * df['profit_margin']
-    
-    return df
+def render_memory_usage(cache, live_bytes=0):
+    """Show shared memory usage in the sidebar"""
+    usage = cache.usage()
+    rss = process_rss()
+    megabyte = 1024 * 1024
+    live_copy = f" + {live_bytes / megabyte:,.1f} MB live copy" if live_bytes else ""
+    
+    with st.sidebar.expander("🧠 Memory"):
+        st.markdown(f"**Base dataset:** {load_data_size() / megabyte:,.1f} MB (shared)")
+        st.markdown(f"**Date index:** {load_date_index().nbytes / megabyte:,.1f} MB{live_copy}")
+        st.markdown(f"**Customer sketches:** {load_customer_sketches().nbytes / megabyte:,.1f} MB")
+        st.markdown(
+            f"**Result cache:** {usage['used_bytes'] / megabyte:,.1f} / "
+            f"{usage['budget_bytes'] / megabyte:,.0f} MB in {usage['entries']} entries"
+        )
+        st.progress(min(usage['used_bytes'] / usage['budget_bytes'], 1.0) if usage['budget_bytes'] else 0.0)
+        st.caption(f"Hits {usage['hits']:,} · Misses {usage['misses']:,} · Evictions {usage['evictions']:,}")
+        if rss is not None:
+            st.markdown(f"**Process RSS:** {rss / megabyte:,.1f} MB")
 
 def create_pdf_report(df, filtered_df, date_range, selected_regions, selected_products):
     """Generate a professional PDF report"""
+    # ReportLab is only needed when a PDF is requested
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
     story = []
@@ -245,20 +240,267 @@ def create_pdf_report(df, filtered_df, date_range, selected_regions, selected_pr
     buffer.seek(0)
     return buffer
 
+def build_timeline_figure(daily_revenue, suffix=""):
+    """Revenue over time (with rolling averages when available)"""
+    rolling_columns = [column for column in daily_revenue.columns if column.endswith('-Day Avg')]
+    fig_timeline = px.line(
+        daily_revenue,
+        x='Date',
+        y=['Revenue'] + rolling_columns if rolling_columns else 'Revenue',
+        title='Daily Revenue Trend' + suffix,
+        labels={'Revenue': 'Revenue ($)', 'value': 'Revenue ($)', 'variable': 'Series'},
+        template='plotly_white'
+    )
+    fig_timeline.update_traces(line_width=2)
+    fig_timeline.update_traces(line_color='#1f77b4', selector=lambda trace: trace.name in (None, '', 'Revenue'))
+    for column, color in zip(rolling_columns, ['#ff7f0e', '#2ca02c']):
+        fig_timeline.update_traces(line_color=color, line_dash='dash', selector=dict(name=column))
+    fig_timeline.update_layout(hovermode='x unified')
+    return fig_timeline
+
+def build_region_figure(region_revenue, suffix=""):
+    """Revenue by region"""
+    return px.bar(
+        region_revenue,
+        x='region',
+        y='revenue',
+        title='Revenue by Region' + suffix,
+        labels={'revenue': 'Revenue ($)', 'region': 'Region'},
+        template='plotly_white',
+        color='revenue',
+        color_continuous_scale='Blues'
+    )
+
+def build_products_figure(product_stats, suffix=""):
+    """Top 10 products by revenue"""
+    return px.bar(
+        product_stats,
+        x='product',
+        y='revenue',
+        title='Top 10 Products by Revenue' + suffix,
+        labels={'revenue': 'Revenue ($)', 'product': 'Product'},
+        template='plotly_white',
+        color='revenue',
+        color_continuous_scale='Viridis'
+    )
+
+def build_category_figure(category_revenue, suffix=""):
+    """Category distribution"""
+    fig_category = px.pie(
+        category_revenue,
+        values='revenue',
+        names='category',
+        title='Revenue Distribution by Category' + suffix,
+        template='plotly_white',
+        hole=0.4
+    )
+    fig_category.update_traces(textposition='inside', textinfo='percent+label')
+    return fig_category
+
+def build_monthly_figure(monthly_metrics, suffix=""):
+    """Monthly revenue vs profit"""
+    fig_monthly = go.Figure()
+    
+    fig_monthly.add_trace(go.Bar(
+        x=monthly_metrics['month'],
+        y=monthly_metrics['revenue'],
+        name='Revenue',
+        marker_color='#1f77b4'
+    ))
+    
+    fig_monthly.add_trace(go.Bar(
+        x=monthly_metrics['month'],
+        y=monthly_metrics['profit'],
+        name='Profit',
+        marker_color='#2ca02c'
+    ))
+    
+    fig_monthly.update_layout(
+        title='Monthly Revenue vs Profit' + suffix,
+        xaxis_title='Month',
+        yaxis_title='Amount ($)',
+        barmode='group',
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    return fig_monthly
+
+def build_retention_figure(retention, suffix=""):
+    """Monthly cohort retention heatmap"""
+    return px.imshow(
+        retention,
+        labels={'x': 'Months Since First Purchase', 'y': 'Cohort', 'color': 'Retention'},
+        title='Monthly Cohort Retention' + suffix,
+        color_continuous_scale='Blues',
+        aspect='auto'
+    )
+
+# Chart placeholder -> (input aggregate, figure builder)
+CHART_FIGURES = {
+    'timeline': ('daily_revenue', build_timeline_figure),
+    'region': ('region_revenue', build_region_figure),
+    'products': ('product_stats', build_products_figure),
+    'category': ('category_revenue', build_category_figure),
+    'monthly': ('monthly_metrics', build_monthly_figure)
+}
+
+def render_figure(container, name, data, build, suffix=""):
+    """Draw a figure from the shared figure cache and return its timing"""
+    spec, timing = get_figure_cache().get_spec(name, data, build, suffix)
+    render_spec(container, spec)
+    return timing
+
+def render_charts(placeholders, aggregates, estimated=False):
+    """Draw (or redraw) each chart into its placeholder"""
+    suffix = " (estimate)" if estimated else ""
+    timings = []
+    for name, (aggregate, build) in CHART_FIGURES.items():
+        data = aggregates[aggregate]
+        if name == 'products':
+            data = data.head(10)
+        timings.append(render_figure(placeholders[name], name, data, build, suffix))
+    return timings
+
+def render_figure_timings(timings):
+    """Show per-figure build and serialize times for this run in the sidebar"""
+    usage = get_figure_cache().usage()
+    with st.sidebar.expander("📈 Chart timings"):
+        st.dataframe(
+            pd.DataFrame({
+                'Figure': [timing.name for timing in timings],
+                'Build (ms)': [timing.build_seconds * 1000 for timing in timings],
+                'Serialize (ms)': [timing.serialize_seconds * 1000 for timing in timings],
+                'Cached': [timing.cached for timing in timings]
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption(
+            f"Figure cache: {usage['entries']} specs, {usage['used_bytes'] / (1024 * 1024):,.1f} MB · "
+            f"Hits {usage['hits']:,} · Misses {usage['misses']:,}"
+        )
+
+def percent_change(current, previous):
+    """Formatted change from a comparison value"""
+    if not previous or pd.isna(previous) or pd.isna(current):
+        return None
+    return f"{(current - previous) / abs(previous):+.1%}"
+
+def render_kpis(placeholders, kpis, grand_total_revenue, comparison=None, comparison_label=None):
+    """
+    Draw the exact KPI cards. With a comparison period, each delta leads with
+    the change against it; cards whose comparison has no data keep only their
+    usual detail (share of total, margin, transactions, units/order).
+    """
+    share = (
+        f"{(kpis['total_revenue'] / grand_total_revenue * 100):.1f}% of total"
+        if grand_total_revenue else "no revenue yet"
+    )
+    cards = (
+        ("Total Revenue", 'total_revenue', f"${kpis['total_revenue']:,.0f}", share),
+        ("Total Profit", 'total_profit', f"${kpis['total_profit']:,.0f}", f"{kpis['avg_margin']:.1%} margin"),
+        ("Units Sold", 'total_units', f"{kpis['total_units']:,}", f"{kpis['transactions']:,} transactions"),
+        ("Avg Order Value", 'avg_order', f"${kpis['avg_order']:,.2f}", f"{kpis['units_per_order']:.1f} units/order")
+    )
+    for placeholder, (label, key, value, detail) in zip(placeholders, cards):
+        change = percent_change(kpis[key], comparison[key]) if comparison is not None else None
+        placeholder.metric(
+            label=label,
+            value=value,
+            delta=f"{change} {comparison_label} · {detail}" if change else detail
+        )
+
+def render_kpi_estimates(placeholders, estimates):
+    """Draw sampled KPI estimates with their 95% confidence ranges"""
+    placeholders[0].metric(
+        label="Total Revenue (estimate)",
+        value=f"≈ ${estimates['total_revenue'].value:,.0f}",
+        delta=f"± ${estimates['total_revenue'].margin:,.0f}",
+        delta_color="off"
+    )
+    placeholders[1].metric(
+        label="Total Profit (estimate)",
+        value=f"≈ ${estimates['total_profit'].value:,.0f}",
+        delta=f"± ${estimates['total_profit'].margin:,.0f}",
+        delta_color="off"
+    )
+    placeholders[2].metric(
+        label="Units Sold (estimate)",
+        value=f"≈ {estimates['total_units'].value:,.0f}",
+        delta=f"± {estimates['total_units'].margin:,.0f}",
+        delta_color="off"
+    )
+    placeholders[3].metric(
+        label="Avg Order Value (estimate)",
+        value=f"≈ ${estimates['avg_order'].value:,.2f}",
+        delta=f"± ${estimates['avg_order'].margin:,.2f}",
+        delta_color="off"
+    )
+
+def render_dashboard(kpi_placeholders, chart_placeholders, dashboard, date_index, comparison_mode,
+                     start_date, end_date, index_filters):
+    """Draw the exact KPIs with the selected comparison, then the charts; return the chart timings"""
+    kpis = dashboard['kpis']
+    
+    # Comparison periods and rolling averages are prefix-sum lookups
+    if comparison_mode == "Share of total":
+        render_kpis(kpi_placeholders, kpis, dashboard['grand_total_revenue'])
+    else:
+        periods = date_index.compare(start_date, end_date, **index_filters)
+        if comparison_mode == "Previous period":
+            comparison, comparison_label = periods['previous_period'], "vs previous period"
+        else:
+            comparison, comparison_label = periods['previous_year'], "vs last year"
+        render_kpis(
+            kpi_placeholders,
+            kpis,
+            dashboard['grand_total_revenue'],
+            comparison=period_kpis(comparison),
+            comparison_label=comparison_label
+        )
+    
+    aggregates = dict(
+        dashboard['aggregates'],
+        daily_revenue=date_index.daily_revenue(start_date, end_date, **index_filters)
+    )
+    return render_charts(chart_placeholders, aggregates)
+
+def live_status(status):
+    """One-line summary of the live feed for the sidebar"""
+    if status['error']:
+        return f"⚠️ {status['error']}"
+    last = (
+        datetime.fromtimestamp(status['last_event_at']).strftime('%H:%M:%S')
+        if status['last_event_at'] else "none yet"
+    )
+    trimmed = f" · {status['dropped']:,} older rows until reload" if status['dropped'] else ""
+    return f"🟢 {status['events']:,} inserts from {status['source']} · last {last}{trimmed}"
+
+def stream_live_updates(feed, version, status_placeholder, redraw):
+    """Keep this run open and redraw the KPIs and charts whenever inserts arrive"""
+    deadline = time.monotonic() + stream_seconds_from_env()
+    while time.monotonic() < deadline:
+        latest = feed.wait(version, timeout=REFRESH_SECONDS)
+        if latest != version:
+            version = latest
+            redraw()
+        # Writing every tick also lets Streamlit end this run as soon as the user interacts
+        status_placeholder.caption(live_status(feed.status()))
+    status_placeholder.caption("⏸️ Live updates paused - interact with the page to resume")
+
 # Main app
 def main():
     st.title("📊 Sales Analytics Dashboard")
     st.markdown("### Real-time Business Intelligence & Reporting")
     
-    # Load data
-    df = load_data()
+    # Load filter dimensions
+    dimensions = load_dimensions()
     
     # Sidebar filters
     st.sidebar.header("🔍 Filters")
     
     # Date range filter
-    min_date = df['date'].min().date()
-    max_date = df['date'].max().date()
+    min_date, max_date = dimensions['date_bounds']
     
     date_range = st.sidebar.date_input(
         "Date Range",
@@ -273,7 +515,7 @@ def main():
         start_date = end_date = date_range[0]
     
     # Region filter
-    regions = ['All'] + sorted(df['region'].unique().tolist())
+    regions = ['All'] + dimensions['region']
     selected_regions = st.sidebar.multiselect(
         "Region",
         options=regions,
@@ -281,7 +523,7 @@ def main():
     )
     
     # Product filter
-    products = ['All'] + sorted(df['product'].unique().tolist())
+    products = ['All'] + dimensions['product']
     selected_products = st.sidebar.multiselect(
         "Product",
         options=products,
@@ -289,181 +531,184 @@ def main():
     )
     
     # Category filter
-    categories = ['All'] + sorted(df['category'].unique().tolist())
+    categories = ['All'] + dimensions['category']
     selected_categories = st.sidebar.multiselect(
         "Category",
         options=categories,
         default=['All']
     )
     
-    # Apply filters
-    filtered_df = df.copy()
-    filtered_df = filtered_df[
-        (filtered_df['date'].dt.date >= start_date) &
-        (filtered_df['date'].dt.date <= end_date)
-    ]
-    
-    if 'All' not in selected_regions:
-        filtered_df = filtered_df[filtered_df['region'].isin(selected_regions)]
+    # KPI comparison
+    comparison_mode = st.sidebar.selectbox(
+        "Compare KPIs with",
+        options=["Share of total", "Previous period", "Same period last year"]
+    )
     
-    if 'All' not in selected_products:
-        filtered_df = filtered_df[filtered_df['product'].isin(selected_products)]
+    # Fast preview mode
+    st.sidebar.header("⚡ Performance")
+    fast_preview = st.sidebar.toggle(
+        "Fast preview (sampled)",
+        help="Show estimates from a stratified sample first, then refine to exact results"
+    )
+    live_updates = st.sidebar.toggle(
+        "Live updates",
+        help="Apply new sales rows as they are inserted and push updated KPIs and charts"
+    )
+    live_status_placeholder = st.sidebar.empty()
     
-    if 'All' not in selected_categories:
-        filtered_df = filtered_df[filtered_df['category'].isin(selected_categories)]
+    region_filter = None if 'All' in selected_regions else selected_regions
+    product_filter = None if 'All' in selected_products else selected_products
+    category_filter = None if 'All' in selected_categories else selected_categories
     
     # Key Metrics
     st.header("📈 Key Performance Indicators")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        total_revenue = filtered_df['revenue'].sum()
-        st.metric(
-            label="Total Revenue",
-            value=f"${total_revenue:,.0f}",
-            delta=f"{(total_revenue / df['revenue'].sum() * 100):.1f}% of total"
-        )
-    
-    with col2:
-        total_profit = filtered_df['profit'].sum()
-        avg_margin = filtered_df['profit_margin'].mean()
-        st.metric(
-            label="Total Profit",
-            value=f"${total_profit:,.0f}",
-            delta=f"{avg_margin:.1%} margin"
-        )
-    
-    with col3:
-        total_units = filtered_df['units_sold'].sum()
-        st.metric(
-            label="Units Sold",
-            value=f"{total_units:,}",
-            delta=f"{len(filtered_df):,} transactions"
-        )
-    
-    with col4:
-        avg_order = filtered_df['revenue'].mean()
-        st.metric(
-            label="Avg Order Value",
-            value=f"${avg_order:,.2f}",
-            delta=f"{filtered_df['units_sold'].mean():.1f} units/order"
-        )
+    kpi_placeholders = [col.empty() for col in st.columns(4)]
     
     # Charts row 1
     st.header("📊 Revenue Analysis")
     
     col1, col2 = st.columns(2)
-    
-    with col1:
-        # Revenue over time
-        daily_revenue = filtered_df.groupby(filtered_df['date'].dt.date)['revenue'].sum().reset_index()
-        daily_revenue.columns = ['Date', 'Revenue']
-        
-        fig_timeline = px.line(
-            daily_revenue,
-            x='Date',
-            y='Revenue',
-            title='Daily Revenue Trend',
-            labels={'Revenue': 'Revenue ($)'},
-            template='plotly_white'
-        )
-        fig_timeline.update_traces(line_color='#1f77b4', line_width=2)
-        fig_timeline.update_layout(hovermode='x unified')
-        st.plotly_chart(fig_timeline, use_container_width=True)
-    
-    with col2:
-        # Revenue by region
-        region_revenue = filtered_df.groupby('region')['revenue'].sum().reset_index()
-        region_revenue = region_revenue.sort_values('revenue', ascending=False)
-        
-        fig_region = px.bar(
-            region_revenue,
-            x='region',
-            y='revenue',
-            title='Revenue by Region',
-            labels={'revenue': 'Revenue ($)', 'region': 'Region'},
-            template='plotly_white',
-            color='revenue',
-            color_continuous_scale='Blues'
-        )
-        st.plotly_chart(fig_region, use_container_width=True)
+    chart_placeholders = {'timeline': col1.empty(), 'region': col2.empty()}
     
     # Charts row 2
     col1, col2 = st.columns(2)
+    chart_placeholders.update({'products': col1.empty(), 'category': col2.empty()})
     
-    with col1:
-        # Product performance
-        product_stats = filtered_df.groupby('product').agg({
-            'revenue': 'sum',
-            'units_sold': 'sum'
-        }).reset_index().sort_values('revenue', ascending=False)
+    # Monthly comparison
+    st.header("📅 Monthly Performance")
+    
+    chart_placeholders['monthly'] = st.empty()
+    
+    # Render estimates from the sample first
+    if fast_preview:
+        sample = load_sample()
+        sample_mask = filter_mask(sample, start_date, end_date, region_filter, product_filter, category_filter)
+        estimates = estimate_kpis(sample, sample_mask)
+        render_kpi_estimates(kpi_placeholders, estimates)
         
-        fig_products = px.bar(
-            product_stats.head(10),
-            x='product',
-            y='revenue',
-            title='Top 10 Products by Revenue',
-            labels={'revenue': 'Revenue ($)', 'product': 'Product'},
-            template='plotly_white',
-            color='revenue',
-            color_continuous_scale='Viridis'
+        sample_aggregates = compute_aggregates(sample[sample_mask.to_numpy()], weight='_weight')
+        render_charts(chart_placeholders, sample_aggregates, estimated=True)
+    
+    # Exact results replace the estimates
+    dashboard = load_dashboard(start_date, end_date, region_filter, product_filter, category_filter)
+    index_filters = {'regions': region_filter, 'products': product_filter, 'categories': category_filter}
+    
+    if live_updates:
+        # KPIs and charts come from the live copy of the date index, patched per insert
+        feed = load_live_feed()
+        dashboard = dict(
+            dashboard, **feed.dashboard(start_date, end_date, region_filter, product_filter, category_filter)
         )
-        st.plotly_chart(fig_products, use_container_width=True)
+        date_index = feed.index
+    else:
+        date_index = load_date_index()
     
-    with col2:
-        # Category distribution
-        category_revenue = filtered_df.groupby('category')['revenue'].sum().reset_index()
-        
-        fig_category = px.pie(
-            category_revenue,
-            values='revenue',
-            names='category',
-            title='Revenue Distribution by Category',
-            template='plotly_white',
-            hole=0.4
+    kpis = dashboard['kpis']
+    total_revenue = kpis['total_revenue']
+    figure_timings = render_dashboard(
+        kpi_placeholders, chart_placeholders, dashboard, date_index, comparison_mode,
+        start_date, end_date, index_filters
+    )
+    
+    # Full rows for customer analytics and exports, shared through the budgeted cache.
+    # Keyed on the dataset version (and the feed version when live), never on a frame's id()
+    if live_updates:
+        base_df, live_version, tail, simulated = feed.snapshot()
+    else:
+        base_df, live_version = load_data(), None
+    df = session_view(base_df)
+    memory_cache = get_memory_cache()
+    filters = make_filters(start_date, end_date, region_filter, product_filter, category_filter)
+    filter_key = (live_version, dataset_version(base_df)) + tuple(filters.values())
+    # Same entry the in-memory backend fills when it answers the KPIs for these filters
+    filtered_df = memory_cache.get_or_create(
+        filtered_key(dataset_version(base_df), filters),
+        lambda: apply_filters(df, start_date, end_date, region_filter, product_filter, category_filter)
+    )
+    export_df, export_kpis = filtered_df, kpis
+    
+    if live_updates and len(tail):
+        # Only the small tail of inserts is filtered per version; the base result is reused
+        live_rows = apply_filters(tail, start_date, end_date, region_filter, product_filter, category_filter)
+        base_rows = filtered_df
+        filtered_df = memory_cache.get_or_create(
+            filtered_key(dataset_version(base_df), filters, live_version),
+            lambda: pd.concat([base_rows, live_rows], ignore_index=True)
         )
-        fig_category.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_category, use_container_width=True)
+        export_df = filtered_df
+        # Simulated rows (local stand-in) are shown but never exported
+        persisted = ~simulated[live_rows.index.to_numpy()]
+        if not persisted.all():
+            export_df = memory_cache.get_or_create(
+                ('export',) + filter_key,
+                lambda: pd.concat([base_rows, live_rows[persisted]], ignore_index=True)
+            )
+        # The live KPIs also count simulated and trimmed rows, which the export does not hold
+        if not persisted.all() or feed.dropped:
+            export_kpis = compute_kpis(export_df)
+    
+    # Customer analytics
+    st.header("👥 Customer Analytics")
+    
+    count_mode = st.radio(
+        "Unique customer counting",
+        options=["Exact", "Approximate (HyperLogLog)"],
+        horizontal=True
+    )
     
-    # Monthly comparison
-    st.header("📅 Monthly Performance")
+    if count_mode == "Exact":
+        unique_customers = unique_customers_exact(filtered_df)
+        count_note = "exact count"
+    else:
+        sketches = feed if live_updates else load_customer_sketches()
+        unique_customers = round(sketches.unique_customers(
+            start_date=start_date,
+            end_date=end_date,
+            regions=region_filter,
+            products=product_filter,
+            categories=category_filter
+        ))
+        count_note = f"±{load_customer_sketches().relative_error:.1%} estimate"
     
-    monthly_data = filtered_df.copy()
-    monthly_data['month'] = monthly_data['date'].dt.to_period('M').astype(str)
+    col1, col2, col3 = st.columns(3)
     
-    monthly_metrics = monthly_data.groupby('month').agg({
-        'revenue': 'sum',
-        'profit': 'sum',
-        'units_sold': 'sum'
-    }).reset_index()
+    with col1:
+        st.metric(
+            label="Unique Customers",
+            value=f"{unique_customers:,}",
+            delta=count_note,
+            delta_color="off"
+        )
     
-    fig_monthly = go.Figure()
+    with col2:
+        revenue_per_customer = total_revenue / unique_customers if unique_customers else 0
+        st.metric(
+            label="Revenue per Customer",
+            value=f"${revenue_per_customer:,.2f}"
+        )
     
-    fig_monthly.add_trace(go.Bar(
-        x=monthly_metrics['month'],
-        y=monthly_metrics['revenue'],
-        name='Revenue',
-        marker_color='#1f77b4'
-    ))
+    with col3:
+        orders_per_customer = kpis['transactions'] / unique_customers if unique_customers else 0
+        st.metric(
+            label="Orders per Customer",
+            value=f"{orders_per_customer:.2f}"
+        )
     
-    fig_monthly.add_trace(go.Bar(
-        x=monthly_metrics['month'],
-        y=monthly_metrics['profit'],
-        name='Profit',
-        marker_color='#2ca02c'
-    ))
+    col1, col2 = st.columns(2)
     
-    fig_monthly.update_layout(
-        title='Monthly Revenue vs Profit',
-        xaxis_title='Month',
-        yaxis_title='Amount ($)',
-        barmode='group',
-        template='plotly_white',
-        hovermode='x unified'
-    )
+    with col1:
+        st.subheader("Top 10 Customers")
+        st.dataframe(
+            top_customers(filtered_df, 10),
+            use_container_width=True,
+            hide_index=True
+        )
     
-    st.plotly_chart(fig_monthly, use_container_width=True)
+    with col2:
+        retention = cohort_retention(filtered_df)
+        if not retention.empty:
+            figure_timings.append(render_figure(col2.empty(), 'retention', retention, build_retention_figure))
     
     # Data table
     st.header("📋 Detailed Data")
@@ -471,17 +716,18 @@ def main():
     # Display options
     col1, col2 = st.columns([3, 1])
     with col1:
-        st.markdown(f"**Showing {len(filtered_df):,} records**")
+        st.markdown(f"**Showing {kpis['transactions']:,} records**")
     with col2:
         show_all = st.checkbox("Show all columns")
     
-    if show_all:
-        display_df = filtered_df
+    detail_rows = dashboard['detail_rows']
+    if show_all or detail_rows.empty:
+        display_df = detail_rows
     else:
-        display_df = filtered_df[['date', 'region', 'product', 'category', 'revenue', 'profit', 'units_sold']]
+        display_df = detail_rows[['date', 'region', 'product', 'category', 'revenue', 'profit', 'units_sold']]
     
     st.dataframe(
-        display_df.sort_values('date', ascending=False).head(100),
+        display_df,
         use_container_width=True,
         hide_index=True
     )
@@ -493,7 +739,10 @@ def main():
     
     with col1:
         # CSV export
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
+        csv = memory_cache.get_or_create(
+            ('csv',) + filter_key,
+            lambda: export_df.to_csv(index=False).encode('utf-8')
+        )
         st.download_button(
             label="📄 Download CSV",
             data=csv,
@@ -502,52 +751,47 @@ def main():
         )
     
     with col2:
-        # Excel export
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            filtered_df.to_excel(writer, sheet_name='Sales Data', index=False)
-            
-            # Add summary sheet
-            summary_df = pd.DataFrame({
-                'Metric': ['Total Revenue', 'Total Profit', 'Total Units Sold', 'Avg Order Value', 'Transactions'],
-                'Value': [
-                    f"${total_revenue:,.2f}",
-                    f"${total_profit:,.2f}",
-                    f"{total_units:,}",
-                    f"${avg_order:,.2f}",
-                    f"{len(filtered_df):,}"
-                ]
-            })
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        excel_buffer.seek(0)
-        st.download_button(
-            label="📊 Download Excel",
-            data=excel_buffer,
-            file_name=f"sales_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+        # Excel export (openpyxl is only loaded when a workbook is requested)
+        if st.button("📊 Generate Excel Report"):
+            with st.spinner("Generating Excel report..."):
+                excel_bytes = memory_cache.get_or_create(
+                    ('excel',) + filter_key,
+                    lambda: create_excel_report(export_df, export_kpis)
+                )
+                
+                st.download_button(
+                    label="📊 Download Excel",
+                    data=excel_bytes,
+                    file_name=f"sales_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
     
     with col3:
         # PDF export
         if st.button("📑 Generate PDF Report"):
             with st.spinner("Generating PDF report..."):
-                pdf_buffer = create_pdf_report(
-                    df, 
-                    filtered_df, 
-                    (start_date, end_date),
-                    selected_regions if 'All' not in selected_regions else [],
-                    selected_products if 'All' not in selected_products else []
+                pdf_bytes = memory_cache.get_or_create(
+                    ('pdf',) + filter_key,
+                    lambda: create_pdf_report(
+                        df, 
+                        export_df, 
+                        (start_date, end_date),
+                        selected_regions if 'All' not in selected_regions else [],
+                        selected_products if 'All' not in selected_products else []
+                    ).getvalue()
                 )
                 
                 st.download_button(
                     label="📑 Download PDF Report",
-                    data=pdf_buffer,
+                    data=pdf_bytes,
                     file_name=f"sales_report_{datetime.now().strftime('%Y%m%d')}.pdf",
                     mime="application/pdf",
                 )
                 st.success("PDF report generated successfully!")
     
+    render_figure_timings(figure_timings)
+    render_memory_usage(memory_cache, feed.nbytes if live_updates else 0)
+    
     # Footer
     st.markdown("---")
     st.markdown(
@@ -557,6 +801,24 @@ def main():
         "</div>",
         unsafe_allow_html=True
     )
+    
+    # Push KPI and chart updates to this session until the user interacts again
+    if live_updates:
+        stream_live_updates(
+            feed,
+            dashboard['version'],
+            live_status_placeholder,
+            lambda: render_dashboard(
+                kpi_placeholders,
+                chart_placeholders,
+                dict(dashboard, **feed.dashboard(start_date, end_date, region_filter, product_filter, category_filter)),
+                feed.index,
+                comparison_mode,
+                start_date,
+                end_date,
+                index_filters
+            )
+        )
 
 if __name__ == "__main__":
     main()
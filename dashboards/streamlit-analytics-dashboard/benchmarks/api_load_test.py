@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+API Load Test
+Measures requests per second and latency of the dashboard JSON API (api.py)
+with concurrent keep-alive clients, for plain and conditional (ETag)
+requests. Starts a local API server unless --url points at a running one.
+
+Usage:
+    python benchmarks/api_load_test.py [--url http://127.0.0.1:8502] [--clients 16] [--duration 10]
+"""
+
+import argparse
+import http.client
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+APP_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PORT = 8599
+
+# A spread of filter combinations, as different scrapers would request them
+QUERIES = [
+    "/api/dashboard",
+    "/api/dashboard?region=Europe",
+    "/api/dashboard?region=Asia+Pacific&region=Europe&product=Product+A",
+    "/api/dashboard?start_date=2024-01-01&end_date=2024-03-31",
+    "/api/dashboard?start_date=2024-04-01&end_date=2024-06-30&category=Software",
+    "/api/dashboard?start_date=2024-07-01&end_date=2024-12-31&region=North+America&category=Hardware",
+    "/api/dashboard?product=Product+C&product=Product+D",
+    "/api/dimensions"
+]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """Run api.py locally and wait until it answers /health"""
+    server = subprocess.Popen(
+        [sys.executable, str(APP_DIR / "api.py"), "--port", str(port)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def client(host: str, port: int, conditional: bool, stop: threading.Event, offset: int, results: list):
+    """Cycle through the queries on one keep-alive connection until stopped"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    etags = {}
+    latencies, statuses = [], Counter()
+    position = offset
+
+    while not stop.is_set():
+        path = QUERIES[position % len(QUERIES)]
+        position += 1
+        headers = {'If-None-Match': etags[path]} if conditional and path in etags else {}
+
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            statuses['error'] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] += 1
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+
+    connection.close()
+    results.append((latencies, statuses))
+
+
+def run(host: str, port: int, clients: int, duration: float, conditional: bool) -> dict:
+    stop = threading.Event()
+    results = []
+    threads = [
+        threading.Thread(target=client, args=(host, port, conditional, stop, offset, results))
+        for offset in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for run_latencies, _ in results for latency in run_latencies)
+    statuses = sum((run_statuses for _, run_statuses in results), Counter())
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [float('nan')] * 99
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': quantiles[49],
+        'p95': quantiles[94],
+        'p99': quantiles[98],
+        'statuses': statuses
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="API base URL (default: start api.py locally)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per measurement")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", DEFAULT_PORT
+        server = start_server(port)
+
+    print("=" * 72)
+    print("🔌 Sales Analytics Dashboard - API Load Test")
+    print("=" * 72)
+    print(f"   http://{host}:{port} · {args.clients} clients · {len(QUERIES)} distinct queries")
+
+    try:
+        # First pass fills the server's caches, as a scraper's first visit would
+        cold_started = time.perf_counter()
+        for path in QUERIES:
+            connection = http.client.HTTPConnection(host, port, timeout=120)
+            connection.request("GET", path)
+            connection.getresponse().read()
+        print(f"   first request for each query: {(time.perf_counter() - cold_started) / len(QUERIES) * 1000:.1f} ms avg")
+
+        print(f"\n{'mode':<24} {'requests':>9} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}  statuses")
+        for label, conditional in (("plain GET", False), ("conditional (ETag)", True)):
+            result = run(host, port, args.clients, args.duration, conditional)
+            statuses = ", ".join(f"{status}: {count:,}" for status, count in sorted(result['statuses'].items(), key=str))
+            print(f"{label:<24} {result['requests']:>9,} {result['rps']:>9,.0f} "
+                  f"{result['p50'] * 1000:>7.2f}ms {result['p95'] * 1000:>7.2f}ms {result['p99'] * 1000:>7.2f}ms  {statuses}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
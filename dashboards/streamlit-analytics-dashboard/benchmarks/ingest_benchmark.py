@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark
+Compares load time and peak memory of the row-wise JSON path (list of dicts
+-> DataFrame -> to_datetime) with the columnar CSV path in ingest.py, for
+growing row counts. Payloads are shaped like PostgREST responses for
+sales_data; each measurement runs in a fresh interpreter.
+
+Usage:
+    python benchmarks/ingest_benchmark.py [--rows 10000 100000 1000000] [--page-size 1000]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+PATHS = {
+    'json rows': 'legacy',
+    'csv arrow': 'arrow',
+    'csv pandas': 'pandas'
+}
+
+# Runs in a fresh interpreter; prints "<seconds> <peak bytes> <frame bytes>"
+LOAD_SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {app_dir!r})
+import pandas as pd
+import ingest
+from memory import process_rss
+
+path, kind, page_size = {payload!r}, {kind!r}, {page_size}
+payload = open(path, 'rb').read()
+if kind != 'legacy':
+    header, body = payload.split(b'\\n', 1)
+    lines = body.splitlines(keepends=True)
+    pages = [header + b'\\n' + b''.join(lines[i:i + page_size]) for i in range(0, len(lines), page_size)]
+    del body, lines
+if kind == 'pandas':
+    ingest.has_arrow = lambda: False
+
+def peak_rss():
+    # VmHWM can be reset on Linux, so setup work before the timer is not counted
+    try:
+        with open('/proc/self/status') as status:
+            return next(int(line.split()[1]) * 1024 for line in status if line.startswith('VmHWM'))
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+try:
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+except OSError:
+    pass
+baseline = process_rss()
+started = time.perf_counter()
+if kind == 'legacy':
+    df = pd.DataFrame(json.loads(payload))
+    df['date'] = pd.to_datetime(df['date'])
+else:
+    df = ingest.csv_to_frame(pages)
+elapsed = time.perf_counter() - started
+
+print(elapsed, max(peak_rss() - baseline, 0), int(df.memory_usage(deep=True).sum()))
+"""
+
+
+def synthetic_sales(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Rows shaped like sales_data as PostgREST returns them (dates as ISO strings)"""
+    rng = np.random.default_rng(seed)
+    regions = np.array(['North America', 'Europe', 'Asia Pacific', 'Latin America', 'Middle East'])
+    products = np.array(['Laptop', 'Smartphone', 'Tablet', 'Headphones', 'Smartwatch', 'Camera', 'Monitor', 'Keyboard'])
+    categories = np.array(['Electronics', 'Accessories', 'Computing', 'Mobile'])
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    revenue = rng.uniform(100, 50000, rows).round(2)
+    margin = rng.uniform(0.1, 0.45, rows).round(4)
+
+    return pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'date': dates.strftime('%Y-%m-%d'),
+        'region': regions[rng.integers(0, len(regions), rows)],
+        'product': products[rng.integers(0, len(products), rows)],
+        'category': categories[rng.integers(0, len(categories), rows)],
+        'revenue': revenue,
+        'units_sold': rng.integers(1, 100, rows),
+        'customer_id': np.char.add('CUST-', rng.integers(1000, 9999, rows).astype(str)),
+        'profit_margin': margin,
+        'profit': (revenue * margin).round(2)
+    })
+
+
+def write_payloads(rows: int, directory: Path) -> dict:
+    """Write the JSON and CSV payloads for one row count"""
+    df = synthetic_sales(rows)
+    json_path = directory / f"sales_{rows}.json"
+    csv_path = directory / f"sales_{rows}.csv"
+    df.to_json(json_path, orient='records')
+    df.to_csv(csv_path, index=False)
+    return {'legacy': json_path, 'arrow': csv_path, 'pandas': csv_path}
+
+
+def measure(payload: Path, kind: str, page_size: int) -> tuple:
+    script = LOAD_SCRIPT.format(app_dir=str(APP_DIR), payload=str(payload), kind=kind, page_size=page_size)
+    result = subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    seconds, peak, frame = result.stdout.split()[-3:]
+    return float(seconds), int(peak), int(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000], help="row counts to load")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per CSV page (PostgREST max-rows)")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("📥 Sales Analytics Dashboard - Ingestion Benchmark")
+    print("=" * 72)
+    print(f"\n{'rows':>10}  {'path':<12} {'time':>9} {'peak memory':>13} {'frame':>10} {'rows/s':>12}")
+
+    megabyte = 1024 * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            payloads = write_payloads(rows, Path(directory))
+            for label, kind in PATHS.items():
+                seconds, peak, frame = measure(payloads[kind], kind, args.page_size)
+                print(f"{rows:>10,}  {label:<12} {seconds:>8.3f}s {peak / megabyte:>10.1f} MB "
+                      f"{frame / megabyte:>7.1f} MB {rows / seconds:>12,.0f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Seed Benchmark
+Times the row-by-row generate_sample_sales_data() function against the
+set-based generate_sales_data procedure from database/setup.sql on a local
+Postgres, in a scratch schema that is dropped afterwards.
+
+Connects with psql, so the usual libpq settings apply (PGHOST, PGPORT,
+PGUSER, ...), or pass a connection string with --dsn.
+
+Usage:
+    python benchmarks/seed_benchmark.py [--dsn postgresql://localhost/postgres] [--rows 100000 1000000]
+"""
+
+import argparse
+import math
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+
+SETUP_SQL = Path(__file__).resolve().parent.parent / "database" / "setup.sql"
+SCHEMA = "seed_benchmark"
+
+# Objects the benchmark needs from setup.sql (the Supabase-only parts are skipped)
+REQUIRED = re.compile(
+    r"^CREATE (TABLE IF NOT EXISTS sales_data|INDEX IF NOT EXISTS idx_sales_\w+ ON sales_data"
+    r"|OR REPLACE (FUNCTION|PROCEDURE) (generate_sample_sales_data|generate_sales_data"
+    r"|sales_random|sales_dimension_values)\b)"
+)
+
+
+def split_statements(sql: str) -> list:
+    """Split a script on semicolons outside dollar-quoted bodies, dropping comment lines"""
+    statements, current, quoted = [], [], False
+    for line in sql.splitlines():
+        if not quoted and line.lstrip().startswith("--"):
+            continue
+        current.append(line)
+        quoted ^= line.count("$$") % 2 == 1
+        if not quoted and line.rstrip().endswith(";"):
+            statements.append("\n".join(current).strip())
+            current = []
+    return statements
+
+
+def setup_statements() -> list:
+    return [statement for statement in split_statements(SETUP_SQL.read_text()) if REQUIRED.match(statement)]
+
+
+class Postgres:
+    """Runs SQL through psql with the scratch schema first on the search path"""
+
+    def __init__(self, dsn: str = None, psql: str = "psql"):
+        self.command = [psql, "-X", "-q", "-A", "-t", "-v", "ON_ERROR_STOP=1"] + (["-d", dsn] if dsn else [])
+        self.env = dict(os.environ, PGOPTIONS=f"-c search_path={SCHEMA},public -c client_min_messages=warning")
+
+    def run(self, sql: str) -> str:
+        result = subprocess.run(self.command, input=sql, env=self.env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    def timed(self, sql: str) -> float:
+        started = time.perf_counter()
+        self.run(sql)
+        return time.perf_counter() - started
+
+    def count(self) -> int:
+        return int(self.run("SELECT count(*) FROM sales_data;"))
+
+
+def reset(db: Postgres, statements: list):
+    """Empty the table and make sure every index exists, as on a fresh setup"""
+    db.run("TRUNCATE sales_data RESTART IDENTITY;\n" + "\n".join(
+        statement for statement in statements if statement.startswith("CREATE INDEX")
+    ))
+
+
+def bench_legacy(db: Postgres, statements: list, rows: int) -> tuple:
+    """Call the row-by-row function until at least ``rows`` rows exist (about 1,825 per call)"""
+    reset(db, statements)
+    calls = max(math.ceil(rows / 1825), 1)
+    seconds = db.timed(f"SELECT generate_sample_sales_data() FROM generate_series(1, {calls});")
+    return seconds, db.count()
+
+
+def bench_set_based(db: Postgres, statements: list, rows: int, batch_size: int, defer_indexes: bool) -> tuple:
+    reset(db, statements)
+    seconds = db.timed(
+        f"CALL generate_sales_data(p_rows => {rows}, p_batch_size => {batch_size}, "
+        f"p_defer_indexes => {str(defer_indexes).lower()});"
+    )
+    return seconds, db.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="connection string (default: DATABASE_URL or libpq env)")
+    parser.add_argument("--psql", default="psql", help="psql executable")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000], help="row counts to generate")
+    parser.add_argument("--batch-size", type=int, default=1000000, help="rows per batch for generate_sales_data")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    db = Postgres(args.dsn, args.psql)
+    statements = setup_statements()
+
+    print("=" * 72)
+    print("🌱 Sales Analytics Dashboard - Seed Benchmark")
+    print("=" * 72)
+    print(f"   {db.run('SHOW server_version;')} · schema {SCHEMA}")
+
+    db.run(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+    try:
+        db.run("\n".join(statements))
+
+        runs = [
+            ("row-by-row function", lambda rows: bench_legacy(db, statements, rows)),
+            ("set-based, live indexes", lambda rows: bench_set_based(db, statements, rows, args.batch_size, False)),
+            ("set-based, deferred indexes", lambda rows: bench_set_based(db, statements, rows, args.batch_size, True))
+        ]
+
+        print(f"\n{'rows':>11}  {'generator':<29} {'time':>9} {'rows/s':>11} {'10M rows (est.)':>16}")
+        for rows in args.rows:
+            for label, bench in runs:
+                seconds, inserted = bench(rows)
+                rate = inserted / seconds
+                print(f"{inserted:>11,}  {label:<29} {seconds:>8.2f}s {rate:>11,.0f} {10_000_000 / rate / 60:>12.1f} min")
+            print()
+    finally:
+        if not args.keep:
+            db.run(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Reports import time per module (as `python -X importtime` does) and the
+time to first render of the dashboard, cold and after the server-start warmup.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat 3]
+"""
+
+import argparse
+import ast
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = APP_DIR / "app.py"
+
+# Heavy dependencies, whether or not app.py imports them at startup
+HEAVY_MODULES = [
+    'streamlit',
+    'pandas',
+    'plotly.express',
+    'plotly.graph_objects',
+    'supabase',
+    'reportlab.platypus',
+    'openpyxl'
+]
+
+# Runs in a fresh interpreter; prints "<seconds> <seconds>" for first render and rerun
+RENDER_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+sys.path.insert(0, {app_dir!r})
+warmup_seconds = 0.0
+if {warm}:
+    import threading
+    import loaders, warmup
+    # As at server start: a background thread with a script run context, or nothing is cached
+    def warm():
+        loaders.attach_cache_context()
+        warmup.warm_caches(log=lambda message: None)
+    thread = threading.Thread(target=warm)
+    thread.start()
+    thread.join()
+    warmup_seconds = time.perf_counter() - started
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app_path!r}, default_timeout=600)
+render_started = time.perf_counter()
+app.run()
+first_render = time.perf_counter() - render_started
+if app.exception:
+    raise SystemExit(app.exception[0].value)
+rerun_started = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - rerun_started
+print(warmup_seconds, first_render, rerun, time.perf_counter() - started)
+"""
+
+
+def top_level_imports(path: Path) -> list:
+    """Modules imported at the top level of a script"""
+    tree = ast.parse(path.read_text())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_times(modules: list) -> dict:
+    """
+    Cumulative import time in seconds for each module, imported in order in
+    one fresh interpreter. Shared dependencies count toward the first module
+    that imports them, exactly as at app startup.
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            microseconds = int(parts[1].strip())
+        except ValueError:
+            continue
+        name = parts[2].strip()
+        if name in modules:
+            cumulative[name] = microseconds / 1e6
+    return cumulative
+
+
+def isolated_import_time(module: str) -> float:
+    """Cumulative import time of one module in a fresh interpreter"""
+    return import_times([module]).get(module, float('nan'))
+
+
+def render_times(warm: bool, repeat: int) -> dict:
+    """Median warmup, first render and rerun times over fresh interpreters"""
+    script = RENDER_SCRIPT.format(app_dir=str(APP_DIR), app_path=str(APP_PATH), warm=warm)
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        samples.append([float(value) for value in result.stdout.split()[-4:]])
+
+    warmup_time, first_render, rerun, total = (statistics.median(column) for column in zip(*samples))
+    return {'warmup': warmup_time, 'first_render': first_render, 'rerun': rerun, 'total': total}
+
+
+def print_import_report():
+    app_modules = top_level_imports(APP_PATH)
+    startup = import_times(app_modules)
+
+    print("\n📦 app.py top-level imports (cumulative, in import order)")
+    for module in app_modules:
+        print(f"   {module:<28} {startup.get(module, 0.0) * 1000:9.1f} ms")
+    print(f"   {'total':<28} {sum(startup.values()) * 1000:9.1f} ms")
+
+    print("\n🐘 Heavy dependencies (each in a fresh interpreter)")
+    for module in HEAVY_MODULES:
+        status = "startup" if module in app_modules or any(
+            imported.startswith(module + ".") for imported in app_modules
+        ) else "on demand"
+        print(f"   {module:<28} {isolated_import_time(module) * 1000:9.1f} ms   ({status})")
+
+
+def print_render_report(repeat: int):
+    print(f"\n⏱️  Time to first render (median of {repeat})")
+    for label, warm in (("cold start", False), ("after warmup", True)):
+        times = render_times(warm, repeat)
+        print(f"   {label:<14} first render {times['first_render']:6.2f}s   "
+              f"rerun {times['rerun']:6.2f}s   warmup {times['warmup']:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per render measurement")
+    parser.add_argument("--skip-render", action="store_true", help="only report import times")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🚀 Sales Analytics Dashboard - Startup Benchmark")
+    print("=" * 60)
+
+    print_import_report()
+    if not args.skip_render:
+        print_render_report(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Customer Analytics
+Unique-customer counting (exact and HyperLogLog), top customers and cohort retention.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['date', 'region', 'product', 'category']
+
+# 2^12 registers gives a standard error of about 1.6%
+DEFAULT_PRECISION = 12
+
+
+def hash_customer_ids(customer_ids) -> np.ndarray:
+    """Hash customer ids to stable 64-bit values"""
+    values = pd.Series(customer_ids).astype(str).to_numpy()
+    return pd.util.hash_array(values, categorize=True)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of each uint64 value"""
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = (values >> np.uint64(shift)) > 0
+        values = np.where(big, values >> np.uint64(shift), values)
+        length += big.astype(np.uint8) * np.uint8(shift)
+    length += (values > 0).astype(np.uint8)
+    return length
+
+
+def register_updates(hashes: np.ndarray, precision: int = DEFAULT_PRECISION):
+    """Split hashes into (register index, rank) pairs"""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    remaining_bits = 64 - precision
+    registers = (hashes >> np.uint64(remaining_bits)).astype(np.int32)
+    remainder = hashes & np.uint64((1 << remaining_bits) - 1)
+    ranks = (remaining_bits - _bit_length(remainder).astype(np.int16) + 1).astype(np.uint8)
+    return registers, ranks
+
+
+def estimate_cardinality(registers: np.ndarray) -> float:
+    """HyperLogLog estimate from a dense register array"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+
+    # Small-range correction (linear counting)
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * np.log(m / zeros)
+
+    return float(estimate)
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog sketch for approximate distinct counts"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = (
+            np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+        )
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes):
+        registers, ranks = register_updates(hashes, self.precision)
+        np.maximum.at(self.registers, registers, ranks)
+        return self
+
+    def add(self, customer_ids):
+        return self.add_hashes(hash_customer_ids(customer_ids))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self) -> float:
+        return estimate_cardinality(self.registers)
+
+
+class CustomerSketchStore:
+    """
+    HyperLogLog sketches of customer_id, pre-merged for fast filtered counts.
+
+    Dense registers per (day, region) answer any date range and region
+    selection by merging a few hundred sketches. Product and category filters
+    use sparse per-cell sketches - one (cell, register, rank) row per non-empty
+    register of each (date, region, product, category) cell - sorted by date,
+    so only the cells of the selected days are read. Rows added one at a time
+    go into a small per-cell overlay of register maxima.
+    """
+
+    def __init__(self, cells: pd.DataFrame, registers: pd.DataFrame, precision: int,
+                 days: pd.DatetimeIndex = None, regions: pd.Index = None, daily: np.ndarray = None):
+        self.cells = cells
+        self.registers = registers
+        self.precision = precision
+        # Shape (days, regions, 2^precision)
+        self.days = pd.DatetimeIndex([]) if days is None else days
+        self.regions = pd.Index([]) if regions is None else regions
+        self.daily = np.zeros((0, 0, 1 << precision), dtype=np.uint8) if daily is None else daily
+        # (date, region, product, category) -> {register: rank} for rows added since the build
+        self.overlay = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, precision: int = DEFAULT_PRECISION):
+        """Build the sketch store from a sales frame"""
+        dates = df['date'].dt.normalize()
+        days = pd.date_range(dates.min(), dates.max(), freq='D') if len(df) else pd.DatetimeIndex([])
+        day_positions = (dates - days[0]).dt.days.to_numpy() if len(df) else np.zeros(0, dtype=np.int64)
+
+        # Cell key = day, then the codes of region, product and category. Sorting it
+        # orders cells by date, so a date range is a contiguous block of cells.
+        cell_keys = day_positions.astype(np.int64)
+        values = {}
+        for column in DIMENSIONS[1:]:
+            codes, values[column] = pd.factorize(df[column])
+            cell_keys = cell_keys * len(values[column]) + codes
+        cell_keys, cell_ids = np.unique(cell_keys, return_inverse=True)
+
+        # Dimension values as categories: there is about one cell per row
+        columns = {}
+        for column in reversed(DIMENSIONS[1:]):
+            columns[column] = pd.Categorical.from_codes(cell_keys % len(values[column]), values[column])
+            cell_keys = cell_keys // len(values[column])
+        cells = pd.DataFrame({'date': days[cell_keys], **{column: columns[column] for column in DIMENSIONS[1:]}})
+        cells.index.name = 'cell'
+
+        registers, ranks = register_updates(hash_customer_ids(df['customer_id']), precision)
+
+        # Highest rank per (cell, register), ordered by cell: one sort on a combined key
+        combined = (cell_ids.astype(np.int64) << precision) | registers
+        order = np.argsort(combined, kind='stable')
+        combined = combined[order]
+        starts = np.flatnonzero(np.diff(combined, prepend=-1))
+        sparse = pd.DataFrame({
+            'cell': (combined[starts] >> precision).astype(np.int32),
+            'register': (combined[starts] & ((1 << precision) - 1)).astype(np.int16),
+            'rank': np.maximum.reduceat(ranks[order], starts) if len(starts) else ranks[:0]
+        })
+
+        # Fold the (already merged) cell sketches into their (day, region) registers
+        regions = pd.Index(values.get('region', []))
+        daily = np.zeros((len(days), len(regions), 1 << precision), dtype=np.uint8)
+        cell = sparse['cell'].to_numpy()
+        np.maximum.at(
+            daily,
+            (cell_keys[cell], cells['region'].cat.codes.to_numpy()[cell], sparse['register'].to_numpy()),
+            sparse['rank'].to_numpy()
+        )
+        return cls(cells, sparse, precision, days, regions, daily)
+
+    def copy(self):
+        """Copy that shares the built sketches and has its own overlay"""
+        store = CustomerSketchStore(
+            self.cells, self.registers, self.precision, self.days, self.regions, self.daily
+        )
+        store.overlay = {key: dict(ranks) for key, ranks in self.overlay.items()}
+        return store
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the built sketches"""
+        return int(
+            self.daily.nbytes
+            + self.registers.memory_usage(index=True, deep=True).sum()
+            + self.cells.memory_usage(index=True, deep=True).sum()
+        )
+
+    def add(self, row: dict):
+        """Add one transaction in constant time"""
+        key = (pd.Timestamp(row['date']).normalize(), row['region'], row['product'], row['category'])
+        registers, ranks = register_updates(hash_customer_ids([row['customer_id']]), self.precision)
+        register, rank = int(registers[0]), int(ranks[0])
+
+        ranks_by_register = self.overlay.setdefault(key, {})
+        if rank > ranks_by_register.get(register, 0):
+            ranks_by_register[register] = rank
+        return self
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(1 << self.precision)
+
+    def select_cells(self, start_date=None, end_date=None, regions=None, products=None, categories=None):
+        """Return the ids of cells matching a filter (None means no restriction)"""
+        dates = self.cells['date'].to_numpy()
+        first = 0 if start_date is None else np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), 'left')
+        last = len(dates) if end_date is None else np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), 'right')
+
+        cells = self.cells.iloc[first:last]
+        mask = np.ones(len(cells), dtype=bool)
+        for column, values in (('region', regions), ('product', products), ('category', categories)):
+            if values is not None:
+                mask &= cells[column].isin(values).to_numpy()
+        return cells.index[mask]
+
+    def _daily_sketch(self, start_date=None, end_date=None, regions=None) -> np.ndarray:
+        """Merge the (day, region) sketches of a date range and region selection"""
+        if not len(self.days):
+            return np.zeros(1 << self.precision, dtype=np.uint8)
+        first = 0 if start_date is None else max((pd.Timestamp(start_date) - self.days[0]).days, 0)
+        last = len(self.days) if end_date is None else max((pd.Timestamp(end_date) - self.days[0]).days + 1, 0)
+
+        days = self.daily[first:last]
+        if regions is not None:
+            days = days[:, np.flatnonzero(self.regions.isin(regions))]
+        if not days.size:
+            return np.zeros(1 << self.precision, dtype=np.uint8)
+        return days.max(axis=(0, 1))
+
+    def _cell_sketch(self, **filters) -> np.ndarray:
+        """Merge the sparse sketches of the matching cells (only the selected days are read)"""
+        cell_ids = self.select_cells(**filters).to_numpy()
+        dense = np.zeros(1 << self.precision, dtype=np.uint8)
+        if not len(cell_ids):
+            return dense
+
+        # Registers are sorted by cell, and the selected cells lie in one date block
+        first, last = cell_ids[0], cell_ids[-1]
+        cells = self.registers['cell'].to_numpy()
+        block = slice(np.searchsorted(cells, first, 'left'), np.searchsorted(cells, last, 'right'))
+        matches = np.zeros(last - first + 1, dtype=bool)
+        matches[cell_ids - first] = True
+        selected = matches[cells[block] - first]
+        np.maximum.at(
+            dense, self.registers['register'].to_numpy()[block][selected], self.registers['rank'].to_numpy()[block][selected]
+        )
+        return dense
+
+    def sketch(self, **filters) -> HyperLogLog:
+        """Merge the sketches of all cells matching a filter"""
+        if filters.get('products') is None and filters.get('categories') is None:
+            dense = self._daily_sketch(filters.get('start_date'), filters.get('end_date'), filters.get('regions'))
+        else:
+            dense = self._cell_sketch(**filters)
+
+        for key, ranks_by_register in list(self.overlay.items()):
+            if _cell_matches(key, **filters):
+                for register, rank in ranks_by_register.items():
+                    dense[register] = max(dense[register], rank)
+        return HyperLogLog(self.precision, dense)
+
+    def unique_customers(self, **filters) -> float:
+        return self.sketch(**filters).count()
+
+
+def _cell_matches(key, start_date=None, end_date=None, regions=None, products=None, categories=None) -> bool:
+    """Whether an overlay cell key passes a filter (same rules as select_cells)"""
+    date, region, product, category = key
+    return (
+        (start_date is None or date >= pd.Timestamp(start_date))
+        and (end_date is None or date <= pd.Timestamp(end_date))
+        and (regions is None or region in regions)
+        and (products is None or product in products)
+        and (categories is None or category in categories)
+    )
+
+
+def unique_customers_exact(df: pd.DataFrame) -> int:
+    """Exact number of distinct customers"""
+    return int(df['customer_id'].nunique())
+
+
+def top_customers(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """Customers ranked by revenue"""
+    customers = df.groupby('customer_id').agg(
+        revenue=('revenue', 'sum'),
+        profit=('profit', 'sum'),
+        units_sold=('units_sold', 'sum'),
+        transactions=('revenue', 'size'),
+        last_purchase=('date', 'max')
+    ).reset_index()
+    return customers.sort_values('revenue', ascending=False).head(n)
+
+
+def cohort_retention(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monthly cohort retention matrix.
+
+    Rows are cohorts (month of first purchase), columns are months since the
+    first purchase and values are the share of the cohort active that month.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    dates = df['date'].dt
+    activity = pd.DataFrame({
+        'customer_id': df['customer_id'].to_numpy(),
+        'month': (dates.year * 12 + dates.month - 1).to_numpy()
+    }).drop_duplicates()
+
+    activity['cohort'] = activity.groupby('customer_id')['month'].transform('min')
+    activity['period'] = activity['month'] - activity['cohort']
+
+    counts = activity.pivot_table(
+        index='cohort', columns='period', values='customer_id', aggfunc='nunique', fill_value=0
+    )
+    retention = counts.div(counts[0], axis=0)
+    retention.index = [f"{month // 12}-{month % 12 + 1:02d}" for month in retention.index]
+    retention.index.name = 'cohort'
+    return retention
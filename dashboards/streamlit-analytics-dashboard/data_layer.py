@@ -0,0 +1,233 @@
+"""
+Data Layer
+Concurrent loading of filter dimensions, aggregates and detail rows.
+
+Each dashboard query is sent to the backend at the same time, so page
+latency is set by the slowest query instead of the sum of all of them.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from aggregates import apply_filters, compute_kpis, compute_aggregates
+
+DIMENSION_COLUMNS = ['region', 'product', 'category']
+CHART_AGGREGATES = ['daily_revenue', 'region_revenue', 'product_stats', 'category_revenue', 'monthly_metrics']
+DETAIL_PAGE_SIZE = 100
+# Filter combinations a FrameBackend keeps a lock for, so concurrent queries share one scan
+FILTER_LOCK_ENTRIES = 64
+
+# sales_breakdown() grouping for each chart aggregate
+BREAKDOWN_GROUPS = {
+    'daily_revenue': 'date',
+    'region_revenue': 'region',
+    'product_stats': 'product',
+    'category_revenue': 'category',
+    'monthly_metrics': 'month'
+}
+
+
+def make_filters(start_date=None, end_date=None, regions=None, products=None, categories=None) -> dict:
+    """Normalized filter dict shared by all backends (None means no restriction)"""
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'regions': tuple(regions) if regions is not None else None,
+        'products': tuple(products) if products is not None else None,
+        'categories': tuple(categories) if categories is not None else None
+    }
+
+
+def filtered_key(version, filters: dict, live_version=None) -> tuple:
+    """Shared-cache key for the filtered rows of a dataset version (and live feed version)"""
+    return ('filtered', live_version, version) + tuple(filters.values())
+
+
+class FrameBackend:
+    """
+    Answers data-layer queries from an in-memory sales frame.
+
+    With a shared ``cache`` (memory.MemoryBudgetCache) and the frame's dataset
+    ``version``, filtered rows and chart aggregates are stored there under the
+    same keys the dashboard uses, so one filter result is held once and counts
+    toward the memory budget. Without a cache nothing is memoized.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache=None, version=None):
+        self.df = df
+        self.cache = cache
+        self.version = version
+        self._lock = threading.Lock()
+        self._key_locks = OrderedDict()
+        self._grand_total = None
+
+    def _key_lock(self, key) -> threading.Lock:
+        """Lock for one filter combination (a small LRU shared by all sessions)"""
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+                if len(self._key_locks) > FILTER_LOCK_ENTRIES:
+                    self._key_locks.popitem(last=False)
+            else:
+                self._key_locks.move_to_end(key)
+            return lock
+
+    def _memoized(self, key, build):
+        if self.cache is None:
+            return build()
+        # Concurrent queries for the same filters share a single scan; other filters are not blocked
+        with self._key_lock(key):
+            return self.cache.get_or_create(key, build)
+
+    def _filter(self, filters):
+        if all(value is None for value in filters.values()):
+            return self.df
+
+        return self._memoized(filtered_key(self.version, filters), lambda: apply_filters(self.df, **{
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in filters.items()
+        }))
+
+    def dimension_values(self, column):
+        return sorted(self.df[column].unique().tolist())
+
+    def date_bounds(self):
+        return self.df['date'].min().date(), self.df['date'].max().date()
+
+    def kpis(self, filters):
+        return compute_kpis(self._filter(filters))
+
+    def grand_total(self):
+        """Unfiltered revenue, computed once per backend (one backend per loaded dataset)"""
+        with self._lock:
+            if self._grand_total is None:
+                self._grand_total = float(self.df['revenue'].sum())
+            return self._grand_total
+
+    def chart_aggregate(self, name, filters):
+        return self._memoized(
+            ('aggregates', self.version) + tuple(filters.values()),
+            lambda: compute_aggregates(self._filter(filters))
+        )[name]
+
+    def detail_rows(self, filters, limit=DETAIL_PAGE_SIZE):
+        return self._filter(filters).sort_values('date', ascending=False).head(limit)
+
+
+class SupabaseBackend:
+    """Pushes data-layer queries down to Supabase (see database/setup.sql)"""
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._grand_total = None
+
+    @staticmethod
+    def _params(filters):
+        def as_list(values):
+            return list(values) if values is not None else None
+
+        return {
+            'p_start': filters['start_date'].isoformat() if filters['start_date'] else None,
+            'p_end': filters['end_date'].isoformat() if filters['end_date'] else None,
+            'p_regions': as_list(filters['regions']),
+            'p_products': as_list(filters['products']),
+            'p_categories': as_list(filters['categories'])
+        }
+
+    def dimension_values(self, column):
+        response = self.client.table(f'{column}_values').select(column).order(column).execute()
+        return [row[column] for row in response.data]
+
+    def date_bounds(self):
+        row = self.client.table('sales_date_bounds').select('*').execute().data[0]
+        return (
+            pd.to_datetime(row['min_date']).date(),
+            pd.to_datetime(row['max_date']).date()
+        )
+
+    def kpis(self, filters):
+        row = self.client.rpc('sales_kpis', self._params(filters)).execute().data[0]
+        return {
+            'total_revenue': float(row['total_revenue'] or 0),
+            'total_profit': float(row['total_profit'] or 0),
+            'avg_margin': float(row['avg_margin'] if row['avg_margin'] is not None else 'nan'),
+            'total_units': int(row['total_units'] or 0),
+            'transactions': int(row['transactions'] or 0),
+            'avg_order': float(row['avg_order'] if row['avg_order'] is not None else 'nan'),
+            'units_per_order': float(row['units_per_order'] if row['units_per_order'] is not None else 'nan')
+        }
+
+    def grand_total(self):
+        """Unfiltered revenue, queried once per backend (one backend per cache period)"""
+        with self._lock:
+            if self._grand_total is None:
+                self._grand_total = self.kpis(make_filters())['total_revenue']
+            return self._grand_total
+
+    def chart_aggregate(self, name, filters):
+        params = dict(self._params(filters), p_group=BREAKDOWN_GROUPS[name])
+        rows = pd.DataFrame(
+            self.client.rpc('sales_breakdown', params).execute().data,
+            columns=['group_key', 'revenue', 'profit', 'units_sold', 'transactions']
+        )
+        rows[['revenue', 'profit']] = rows[['revenue', 'profit']].astype(float)
+
+        if name == 'daily_revenue':
+            return pd.DataFrame({'Date': pd.to_datetime(rows['group_key']), 'Revenue': rows['revenue']})
+        if name == 'monthly_metrics':
+            return rows.rename(columns={'group_key': 'month'})[['month', 'revenue', 'profit', 'units_sold']]
+
+        dimension = BREAKDOWN_GROUPS[name]
+        columns = [dimension, 'revenue', 'units_sold'] if name == 'product_stats' else [dimension, 'revenue']
+        frame = rows.rename(columns={'group_key': dimension})[columns]
+        if name == 'category_revenue':
+            return frame
+        return frame.sort_values('revenue', ascending=False)
+
+    def detail_rows(self, filters, limit=DETAIL_PAGE_SIZE):
+        query = self.client.table('sales_data').select('*')
+        if filters['start_date']:
+            query = query.gte('date', filters['start_date'].isoformat())
+        if filters['end_date']:
+            query = query.lte('date', filters['end_date'].isoformat())
+        for column, values in (('region', filters['regions']), ('product', filters['products']),
+                               ('category', filters['categories'])):
+            if values is not None:
+                query = query.in_(column, list(values))
+
+        rows = pd.DataFrame(query.order('date', desc=True).limit(limit).execute().data)
+        if not rows.empty:
+            rows['date'] = pd.to_datetime(rows['date'])
+        return rows
+
+
+async def fetch_dimensions(backend) -> dict:
+    """Fetch the sidebar options and date bounds concurrently"""
+    results = await asyncio.gather(
+        asyncio.to_thread(backend.date_bounds),
+        *[asyncio.to_thread(backend.dimension_values, column) for column in DIMENSION_COLUMNS]
+    )
+    dimensions = dict(zip(DIMENSION_COLUMNS, results[1:]))
+    dimensions['date_bounds'] = results[0]
+    return dimensions
+
+
+async def fetch_dashboard(backend, filters: dict, page_size: int = DETAIL_PAGE_SIZE) -> dict:
+    """Fetch KPIs, the grand total, chart aggregates and the first page of detail rows concurrently"""
+    results = await asyncio.gather(
+        asyncio.to_thread(backend.kpis, filters),
+        asyncio.to_thread(backend.grand_total),
+        asyncio.to_thread(backend.detail_rows, filters, page_size),
+        *[asyncio.to_thread(backend.chart_aggregate, name, filters) for name in CHART_AGGREGATES]
+    )
+    return {
+        'kpis': results[0],
+        'grand_total_revenue': results[1],
+        'detail_rows': results[2],
+        'aggregates': dict(zip(CHART_AGGREGATES, results[3:]))
+    }
@@ -93,6 +93,101 @@ $$ LANGUAGE plpgsql;
 -- Uncomment the line below to populate the table with sample data
 -- SELECT generate_sample_sales_data();
 
+-- =====================================================
+-- Bulk Data Generation (Optional)
+-- Set-based generator for load-test volumes
+-- =====================================================
+
+-- Deterministic uniform value in [0, 1) for row n and stream k
+-- (the same row gets the same values whatever the batch size)
+CREATE OR REPLACE FUNCTION sales_random(n BIGINT, k INTEGER, seed BIGINT)
+RETURNS DOUBLE PRECISION AS $$
+    SELECT (hashint8extended(n, seed * 31 + k) & 9007199254740991)::double precision / 9007199254740992;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Value i of a dimension: the dashboard's names first, then generated ones
+CREATE OR REPLACE FUNCTION sales_dimension_values(names TEXT[], prefix TEXT, cardinality INTEGER)
+RETURNS TEXT[] AS $$
+    SELECT array_agg(COALESCE(names[i], prefix || ' ' || i) ORDER BY i)
+    FROM generate_series(1, cardinality) AS i;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Insert p_rows rows spread uniformly over the p_days days ending p_end_date.
+-- Rows are inserted p_batch_size at a time, each batch in its own transaction.
+-- With p_defer_indexes the secondary indexes are dropped first and rebuilt
+-- once at the end, which is much faster than maintaining them row by row.
+CREATE OR REPLACE PROCEDURE generate_sales_data(
+    p_rows BIGINT DEFAULT 1000000,
+    p_days INTEGER DEFAULT 365,
+    p_end_date DATE DEFAULT CURRENT_DATE,
+    p_regions INTEGER DEFAULT 5,
+    p_products INTEGER DEFAULT 5,
+    p_categories INTEGER DEFAULT 5,
+    p_customers INTEGER DEFAULT 9000,
+    p_seed BIGINT DEFAULT 42,
+    p_batch_size BIGINT DEFAULT 1000000,
+    p_defer_indexes BOOLEAN DEFAULT TRUE
+) AS $$
+DECLARE
+    v_regions TEXT[] := sales_dimension_values(
+        ARRAY['North America', 'Europe', 'Asia Pacific', 'Latin America', 'Middle East'], 'Region', p_regions);
+    v_products TEXT[] := sales_dimension_values(
+        ARRAY['Product A', 'Product B', 'Product C', 'Product D', 'Product E'], 'Product', p_products);
+    v_categories TEXT[] := sales_dimension_values(
+        ARRAY['Electronics', 'Software', 'Services', 'Hardware', 'Accessories'], 'Category', p_categories);
+    v_start BIGINT := 0;
+BEGIN
+    IF p_defer_indexes THEN
+        DROP INDEX IF EXISTS idx_sales_date;
+        DROP INDEX IF EXISTS idx_sales_region;
+        DROP INDEX IF EXISTS idx_sales_product;
+        DROP INDEX IF EXISTS idx_sales_category;
+        DROP INDEX IF EXISTS idx_sales_customer;
+        COMMIT;
+    END IF;
+
+    WHILE v_start < p_rows LOOP
+        -- Generated rows can be replayed, so the batch need not wait for the WAL flush
+        PERFORM set_config('synchronous_commit', 'off', true);
+
+        -- Amounts are drawn as whole cents and basis points, which is much cheaper
+        -- than rounding numerics; OFFSET 0 stops the planner from inlining the
+        -- subquery, so revenue and margin are drawn once per row
+        INSERT INTO sales_data (date, region, product, category, revenue, units_sold, customer_id, profit_margin, profit)
+        SELECT date, region, product, category, revenue, units_sold, customer_id, margin, round(revenue * margin, 2)
+        FROM (
+            SELECT
+                p_end_date - floor(sales_random(n, 1, p_seed) * p_days)::int AS date,
+                v_regions[1 + floor(sales_random(n, 2, p_seed) * p_regions)::int] AS region,
+                v_products[1 + floor(sales_random(n, 3, p_seed) * p_products)::int] AS product,
+                v_categories[1 + floor(sales_random(n, 4, p_seed) * p_categories)::int] AS category,
+                (100000 + floor(sales_random(n, 7, p_seed) * 4900000)::int)::numeric / 100 AS revenue,
+                1 + floor(sales_random(n, 5, p_seed) * 100)::int AS units_sold,
+                'CUST-' || (1000 + floor(sales_random(n, 6, p_seed) * p_customers)::int) AS customer_id,
+                (1500 + floor(sales_random(n, 8, p_seed) * 3000)::int)::numeric / 10000 AS margin
+            FROM generate_series(v_start, LEAST(v_start + p_batch_size, p_rows) - 1) AS n
+            OFFSET 0
+        ) AS generated;
+
+        COMMIT;
+        v_start := v_start + p_batch_size;
+    END LOOP;
+
+    IF p_defer_indexes THEN
+        CREATE INDEX IF NOT EXISTS idx_sales_date ON sales_data(date);
+        CREATE INDEX IF NOT EXISTS idx_sales_region ON sales_data(region);
+        CREATE INDEX IF NOT EXISTS idx_sales_product ON sales_data(product);
+        CREATE INDEX IF NOT EXISTS idx_sales_category ON sales_data(category);
+        CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales_data(customer_id);
+    END IF;
+
+    ANALYZE sales_data;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Example: 10 million rows over two years, 20 products, 50,000 customers
+-- CALL generate_sales_data(p_rows => 10000000, p_days => 730, p_products => 20, p_customers => 50000);
+
 -- =====================================================
 -- Useful Views
 -- =====================================================
@@ -151,6 +246,137 @@ FROM sales_data
 GROUP BY DATE_TRUNC('month', date)
 ORDER BY month DESC;
 
+-- =====================================================
+-- Dashboard Data Layer
+-- Small queries the dashboard sends concurrently
+-- =====================================================
+
+-- Distinct filter options. Postgres has no skip scan, so SELECT DISTINCT reads
+-- every row; these walk idx_sales_<dimension> instead, one index probe per
+-- distinct value (a loose index scan)
+CREATE OR REPLACE VIEW region_values AS
+WITH RECURSIVE walk(region) AS (
+    (SELECT region FROM sales_data ORDER BY region LIMIT 1)
+    UNION ALL
+    SELECT (SELECT s.region FROM sales_data s WHERE s.region > walk.region ORDER BY s.region LIMIT 1)
+    FROM walk
+    WHERE walk.region IS NOT NULL
+)
+SELECT region FROM walk WHERE region IS NOT NULL;
+
+CREATE OR REPLACE VIEW product_values AS
+WITH RECURSIVE walk(product) AS (
+    (SELECT product FROM sales_data ORDER BY product LIMIT 1)
+    UNION ALL
+    SELECT (SELECT s.product FROM sales_data s WHERE s.product > walk.product ORDER BY s.product LIMIT 1)
+    FROM walk
+    WHERE walk.product IS NOT NULL
+)
+SELECT product FROM walk WHERE product IS NOT NULL;
+
+CREATE OR REPLACE VIEW category_values AS
+WITH RECURSIVE walk(category) AS (
+    (SELECT category FROM sales_data ORDER BY category LIMIT 1)
+    UNION ALL
+    SELECT (SELECT s.category FROM sales_data s WHERE s.category > walk.category ORDER BY s.category LIMIT 1)
+    FROM walk
+    WHERE walk.category IS NOT NULL
+)
+SELECT category FROM walk WHERE category IS NOT NULL;
+
+-- Date range for the date picker
+CREATE OR REPLACE VIEW sales_date_bounds AS
+SELECT 
+    MIN(date) as min_date,
+    MAX(date) as max_date
+FROM sales_data;
+
+-- Filtered KPI aggregates (NULL filters mean no restriction)
+CREATE OR REPLACE FUNCTION sales_kpis(
+    p_start DATE DEFAULT NULL,
+    p_end DATE DEFAULT NULL,
+    p_regions TEXT[] DEFAULT NULL,
+    p_products TEXT[] DEFAULT NULL,
+    p_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    total_revenue NUMERIC,
+    total_profit NUMERIC,
+    avg_margin NUMERIC,
+    total_units BIGINT,
+    transactions BIGINT,
+    avg_order NUMERIC,
+    units_per_order NUMERIC
+) AS $$
+    SELECT 
+        COALESCE(SUM(revenue), 0),
+        COALESCE(SUM(profit), 0),
+        AVG(profit_margin),
+        COALESCE(SUM(units_sold), 0),
+        COUNT(*),
+        AVG(revenue),
+        AVG(units_sold)
+    FROM sales_data
+    WHERE (p_start IS NULL OR date >= p_start)
+      AND (p_end IS NULL OR date <= p_end)
+      AND (p_regions IS NULL OR region = ANY(p_regions))
+      AND (p_products IS NULL OR product = ANY(p_products))
+      AND (p_categories IS NULL OR category = ANY(p_categories));
+$$ LANGUAGE sql STABLE;
+
+-- Filtered chart aggregates grouped by date, month, region, product or category
+CREATE OR REPLACE FUNCTION sales_breakdown(
+    p_group TEXT,
+    p_start DATE DEFAULT NULL,
+    p_end DATE DEFAULT NULL,
+    p_regions TEXT[] DEFAULT NULL,
+    p_products TEXT[] DEFAULT NULL,
+    p_categories TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    group_key TEXT,
+    revenue NUMERIC,
+    profit NUMERIC,
+    units_sold BIGINT,
+    transactions BIGINT
+) AS $$
+    SELECT 
+        CASE p_group
+            WHEN 'date' THEN date::text
+            WHEN 'month' THEN TO_CHAR(date, 'YYYY-MM')
+            WHEN 'region' THEN region
+            WHEN 'product' THEN product
+            WHEN 'category' THEN category
+        END as group_key,
+        SUM(revenue),
+        SUM(profit),
+        SUM(units_sold),
+        COUNT(*)
+    FROM sales_data
+    WHERE (p_start IS NULL OR date >= p_start)
+      AND (p_end IS NULL OR date <= p_end)
+      AND (p_regions IS NULL OR region = ANY(p_regions))
+      AND (p_products IS NULL OR product = ANY(p_products))
+      AND (p_categories IS NULL OR category = ANY(p_categories))
+    GROUP BY 1
+    ORDER BY 1;
+$$ LANGUAGE sql STABLE;
+
+-- =====================================================
+-- Live Updates
+-- Streams inserts on sales_data to the dashboard through Supabase Realtime
+-- =====================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'sales_data'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE sales_data;
+    END IF;
+END $$;
+
 -- =====================================================
 -- Grant permissions to views
 -- =====================================================
@@ -159,9 +385,21 @@ GRANT SELECT ON daily_revenue_summary TO authenticated;
 GRANT SELECT ON regional_performance TO authenticated;
 GRANT SELECT ON product_performance TO authenticated;
 GRANT SELECT ON monthly_summary TO authenticated;
+GRANT SELECT ON region_values TO authenticated;
+GRANT SELECT ON product_values TO authenticated;
+GRANT SELECT ON category_values TO authenticated;
+GRANT SELECT ON sales_date_bounds TO authenticated;
+GRANT EXECUTE ON FUNCTION sales_kpis TO authenticated;
+GRANT EXECUTE ON FUNCTION sales_breakdown TO authenticated;
 
 -- For public access (if needed)
 GRANT SELECT ON daily_revenue_summary TO anon;
 GRANT SELECT ON regional_performance TO anon;
 GRANT SELECT ON product_performance TO anon;
 GRANT SELECT ON monthly_summary TO anon;
+GRANT SELECT ON region_values TO anon;
+GRANT SELECT ON product_values TO anon;
+GRANT SELECT ON category_values TO anon;
+GRANT SELECT ON sales_date_bounds TO anon;
+GRANT EXECUTE ON FUNCTION sales_kpis TO anon;
+GRANT EXECUTE ON FUNCTION sales_breakdown TO anon;
@@ -0,0 +1,324 @@
+"""
+Date Index
+Daily prefix sums per (region, product, category) cell.
+
+Any date-range total is ``cum[end + 1] - cum[start]`` summed over the cells
+matching the filter. Lookups read only those two day positions of the
+matching cells, so range KPIs and comparison periods cost the same no matter
+how many rows or days they cover; a daily series reads the days it returns.
+
+Running totals are stored in two parts, about half the size of one float64
+array: the exact total at the start of every block of BLOCK_DAYS positions
+(float64), and each position's float32 offset from its block's total. An
+offset only spans one block of one cell, so daily values stay accurate no
+matter how large the running totals grow.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+CELL_DIMENSIONS = ['region', 'product', 'category']
+INDEX_MEASURES = ['revenue', 'profit', 'units_sold', 'transactions', 'profit_margin']
+BLOCK_DAYS = 64
+# Cells whose running totals a batch append materializes at a time
+APPEND_CHUNK_CELLS = 256
+
+
+class PrefixSumIndex:
+    """Cumulative daily sums of revenue, profit, units, count and margin per cell"""
+
+    def __init__(self):
+        self.start = None
+        self.cells = pd.DataFrame(columns=CELL_DIMENSIONS)
+        self._cell_ids = {}
+        # Running total at prefix position p (0 = before the first day, always zero)
+        # of a cell is bases[cell, p // BLOCK_DAYS] + offsets[cell, p]
+        self.bases = np.zeros((0, 1, len(INDEX_MEASURES)))
+        self.offsets = np.zeros((0, 1, len(INDEX_MEASURES)), dtype=np.float32)
+        # Readers and live inserts may run on different threads
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        """Build the index from a sales frame"""
+        index = cls()
+        index.append(df)
+        return index
+
+    def copy(self):
+        """Independent copy that can be updated without touching this index"""
+        with self._lock:
+            index = PrefixSumIndex()
+            index.start = self.start
+            index.cells = self.cells.copy()
+            index._cell_ids = dict(self._cell_ids)
+            index.bases = self.bases.copy()
+            index.offsets = self.offsets.copy()
+            return index
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the running totals"""
+        return self.bases.nbytes + self.offsets.nbytes
+
+    @property
+    def days(self) -> int:
+        return self.offsets.shape[1] - 1
+
+    @property
+    def end(self):
+        return self.start + pd.Timedelta(days=self.days - 1)
+
+    @staticmethod
+    def _split(cumulative: np.ndarray):
+        """Block totals and float32 offsets of float64 running totals (cells, positions, measures)"""
+        bases = cumulative[:, ::BLOCK_DAYS].copy()
+        offsets = cumulative - np.repeat(bases, BLOCK_DAYS, axis=1)[:, :cumulative.shape[1]]
+        return bases, offsets.astype(np.float32)
+
+    def _cumulative(self, cells=slice(None)) -> np.ndarray:
+        """Float64 running totals of some cells at every position"""
+        offsets = self.offsets[cells]
+        return np.repeat(self.bases[cells], BLOCK_DAYS, axis=1)[:, :offsets.shape[1]] + offsets
+
+    def _gather(self, cells, positions, measures=slice(None)) -> np.ndarray:
+        """Float64 running totals of the given cells at the given positions"""
+        cells = np.asarray(cells)[:, None]
+        positions = np.asarray(positions)[None, :]
+        return self.bases[cells, positions // BLOCK_DAYS, measures] + self.offsets[cells, positions, measures]
+
+    def _ensure_days(self, first, last):
+        """Grow the day axis so it covers [first, last]"""
+        if self.start is None:
+            self.start = first
+            self.bases = np.zeros((len(self.bases), 1, len(INDEX_MEASURES)))
+            self.offsets = np.zeros((len(self.offsets), 1, len(INDEX_MEASURES)), dtype=np.float32)
+
+        before = max((self.start - first).days, 0)
+        after = max((last - self.end).days, 0) if self.days else (last - self.start).days + 1
+        if not (before or after):
+            return
+
+        # Positions move between blocks, so the totals are split again
+        cumulative = self._cumulative()
+        if before:
+            # Days before the old start contribute nothing yet
+            padding = np.zeros((len(cumulative), before, len(INDEX_MEASURES)))
+            cumulative = np.concatenate([cumulative[:, :1], padding, cumulative[:, 1:]], axis=1)
+            self.start = first
+        if after:
+            # Days after the old end carry the running total forward
+            padding = np.repeat(cumulative[:, -1:], after, axis=1)
+            cumulative = np.concatenate([cumulative, padding], axis=1)
+        self.bases, self.offsets = self._split(cumulative)
+
+    def _ensure_cells(self, keys: pd.DataFrame) -> np.ndarray:
+        """Map each row to its cell id, adding cells for new dimension values"""
+        new_keys = keys.drop_duplicates()
+        new_keys = new_keys[[key not in self._cell_ids for key in new_keys.itertuples(index=False, name=None)]]
+        if len(new_keys):
+            for key in new_keys.itertuples(index=False, name=None):
+                self._cell_ids[key] = len(self._cell_ids)
+            if self.cells.empty:
+                self.cells = new_keys.reset_index(drop=True)
+            else:
+                self.cells = pd.concat([self.cells, new_keys], ignore_index=True)
+            self.bases = np.concatenate([self.bases, np.zeros((len(new_keys),) + self.bases.shape[1:])], axis=0)
+            self.offsets = np.concatenate(
+                [self.offsets, np.zeros((len(new_keys),) + self.offsets.shape[1:], dtype=np.float32)], axis=0
+            )
+
+        return np.array([self._cell_ids[key] for key in keys.itertuples(index=False, name=None)], dtype=np.int64)
+
+    def append(self, rows: pd.DataFrame):
+        """Add rows incrementally; work is proportional to the rows and days touched"""
+        if rows.empty:
+            return self
+
+        with self._lock:
+            return self._append(rows)
+
+    def _append(self, rows: pd.DataFrame):
+        dates = rows['date'].dt.normalize()
+        self._ensure_days(dates.min(), dates.max())
+
+        # Aggregate the batch per (cell, day) first so each cell/day is updated once
+        batch = rows[CELL_DIMENSIONS].assign(
+            day=(dates - self.start).dt.days.to_numpy(),
+            revenue=rows['revenue'].to_numpy(dtype=float),
+            profit=rows['profit'].to_numpy(dtype=float),
+            units_sold=rows['units_sold'].to_numpy(dtype=float),
+            transactions=1.0,
+            profit_margin=rows['profit_margin'].to_numpy(dtype=float)
+        ).groupby(CELL_DIMENSIONS + ['day'], sort=False, observed=True)[INDEX_MEASURES].sum().reset_index()
+
+        cell_ids = self._ensure_cells(batch[CELL_DIMENSIONS])
+        order = np.argsort(cell_ids, kind='stable')
+        cell_ids = cell_ids[order]
+        days = batch['day'].to_numpy()[order]
+        values = batch[INDEX_MEASURES].to_numpy()[order]
+
+        # Only the touched cells from the earliest touched day onward change. They are
+        # updated a chunk of cells at a time, so the float64 totals are never all held at once.
+        touched, local_ids = np.unique(cell_ids, return_inverse=True)
+        first_day = int(days.min())
+        for first_cell in range(0, len(touched), APPEND_CHUNK_CELLS):
+            cells = touched[first_cell:first_cell + APPEND_CHUNK_CELLS]
+            rows_from, rows_to = np.searchsorted(local_ids, [first_cell, first_cell + len(cells)])
+            daily = np.zeros((len(cells), self.days - first_day, len(INDEX_MEASURES)))
+            np.add.at(
+                daily,
+                (local_ids[rows_from:rows_to] - first_cell, days[rows_from:rows_to] - first_day),
+                values[rows_from:rows_to]
+            )
+            cumulative = self._cumulative(cells)
+            cumulative[:, first_day + 1:] += np.cumsum(daily, axis=1)
+            self.bases[cells], self.offsets[cells] = self._split(cumulative)
+        return self
+
+    def add(self, row: dict):
+        """
+        Add a single row. Only the row's cell from its day onward changes, so
+        the cost depends on the number of days indexed, not on the table size.
+        """
+        day = pd.Timestamp(row['date']).normalize()
+        key = tuple(row[column] for column in CELL_DIMENSIONS)
+        values = [row['revenue'], row['profit'], row['units_sold'], 1.0, row['profit_margin']]
+
+        with self._lock:
+            # Growing the day axis copies the arrays, which happens once per new day
+            if self.start is None or not self.start <= day <= self.end:
+                self._ensure_days(day, day)
+            if key not in self._cell_ids:
+                self._ensure_cells(pd.DataFrame([key], columns=CELL_DIMENSIONS))
+            cell = self._cell_ids[key]
+            position = (day - self.start).days + 1
+            block = position // BLOCK_DAYS
+            # Offsets to the end of the row's block, then the totals of later blocks
+            self.offsets[cell, position:(block + 1) * BLOCK_DAYS] += values
+            self.bases[cell, block + 1:] += values
+        return self
+
+    def _cell_mask(self, regions=None, products=None, categories=None) -> np.ndarray:
+        mask = np.ones(len(self.cells), dtype=bool)
+        for column, values in (('region', regions), ('product', products), ('category', categories)):
+            if values is not None:
+                mask &= self.cells[column].isin(values).to_numpy()
+        return mask
+
+    def _cell_positions(self, regions=None, products=None, categories=None) -> np.ndarray:
+        """Cell ids matching a dimension selection"""
+        return np.flatnonzero(self._cell_mask(regions, products, categories))
+
+    def _position(self, date) -> int:
+        """Prefix position for the start of ``date``, clamped to the index"""
+        return int(np.clip((pd.Timestamp(date) - self.start).days, 0, self.days))
+
+    def totals(self, start_date, end_date, regions=None, products=None, categories=None) -> dict:
+        """Sum of each measure between two dates (inclusive)"""
+        if self.start is None or pd.Timestamp(end_date) < pd.Timestamp(start_date):
+            return dict.fromkeys(INDEX_MEASURES, 0.0)
+
+        with self._lock:
+            first = self._position(start_date)
+            last = self._position(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+            # Gather the two prefix positions before summing, never the whole day axis
+            ends = self._gather(self._cell_positions(regions, products, categories), [first, last]).sum(axis=0)
+            return dict(zip(INDEX_MEASURES, ends[1] - ends[0]))
+
+    def compare(self, start_date, end_date, **filters) -> dict:
+        """Totals for a range, the period just before it and the same range last year"""
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        length = end - start + pd.Timedelta(days=1)
+        year = pd.DateOffset(years=1)
+        return {
+            'current': self.totals(start, end, **filters),
+            'previous_period': self.totals(start - length, start - pd.Timedelta(days=1), **filters),
+            'previous_year': self.totals(start - year, end - year, **filters)
+        }
+
+    def daily_revenue(self, start_date, end_date, windows=(7, 30), **filters) -> pd.DataFrame:
+        """Daily revenue with trailing rolling averages over each window (in days)"""
+        if self.start is None:
+            return pd.DataFrame(columns=['Date', 'Revenue'] + [f'{window}-Day Avg' for window in windows])
+
+        with self._lock:
+            first = self._position(start_date)
+            last = self._position(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+            # Only the revenue prefix sums of the range (plus the longest window before it) are read
+            offset = max(first - max(windows, default=0), 0)
+            # Block totals and offsets are summed over the cells separately, then combined
+            cells = self._cell_positions(**filters)
+            bases = self.bases[cells, :, 0].sum(axis=0)
+            offsets = self.offsets[cells, offset:last + 1, 0].sum(axis=0, dtype=np.float64)
+            selected = bases[np.arange(offset, last + 1) // BLOCK_DAYS] + offsets
+        positions = np.arange(first + 1, last + 1)
+
+        series = pd.DataFrame({
+            'Date': self.start + pd.to_timedelta(positions - 1, unit='D'),
+            'Revenue': selected[positions - offset] - selected[positions - 1 - offset]
+        })
+        for window in windows:
+            lower = np.maximum(positions - window, 0)
+            series[f'{window}-Day Avg'] = (selected[positions - offset] - selected[lower - offset]) / (positions - lower)
+        return series
+
+    def aggregates(self, start_date, end_date, **filters) -> dict:
+        """Chart aggregates (as in aggregates.compute_aggregates) from per-cell and per-month range sums"""
+        columns = ['revenue', 'profit', 'units_sold']
+        if self.start is None:
+            cells = self.cells.assign(**dict.fromkeys(INDEX_MEASURES, 0.0)).iloc[:0]
+            months = pd.DataFrame(columns=['month'] + INDEX_MEASURES)
+        else:
+            with self._lock:
+                mask = self._cell_mask(**filters)
+                first = self._position(start_date)
+                last = self._position(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+
+                # Month boundaries inside the range, as prefix positions
+                month_starts = pd.date_range(
+                    pd.Timestamp(start_date).to_period('M').to_timestamp(), pd.Timestamp(end_date), freq='MS'
+                )
+                bounds = np.unique(np.clip(
+                    np.concatenate([[first], (month_starts - self.start).days, [last]]), first, last
+                ))
+                # Prefix sums at the range and month boundaries only, for the matching cells
+                selected = self._gather(np.flatnonzero(mask), bounds)
+                per_cell = selected[:, -1] - selected[:, 0]
+                per_month = np.diff(selected.sum(axis=0), axis=0)
+                cells = self.cells[mask].reset_index(drop=True)
+
+            cells = cells.assign(**dict(zip(INDEX_MEASURES, per_cell.T)))
+            months = pd.DataFrame(per_month, columns=INDEX_MEASURES).assign(
+                month=(self.start + pd.to_timedelta(bounds[:-1], unit='D')).strftime('%Y-%m')
+            )
+
+        cells = cells[cells['transactions'] > 0]
+        months = months[months['transactions'] > 0]
+
+        region_revenue = cells.groupby('region', observed=True)['revenue'].sum().reset_index()
+        product_stats = cells.groupby('product', observed=True)[['revenue', 'units_sold']].sum().reset_index()
+        return {
+            'daily_revenue': self.daily_revenue(start_date, end_date, windows=(), **filters),
+            'region_revenue': region_revenue.sort_values('revenue', ascending=False),
+            'product_stats': product_stats.sort_values('revenue', ascending=False),
+            'category_revenue': cells.groupby('category', observed=True)['revenue'].sum().reset_index(),
+            'monthly_metrics': months[['month'] + columns].reset_index(drop=True)
+        }
+
+
+def period_kpis(totals: dict) -> dict:
+    """KPI values (as in aggregates.compute_kpis) from index totals"""
+    transactions = int(round(totals['transactions']))
+    orders = transactions if transactions else float('nan')
+    return {
+        'total_revenue': totals['revenue'],
+        'total_profit': totals['profit'],
+        'avg_margin': totals['profit_margin'] / orders,
+        'total_units': int(round(totals['units_sold'])),
+        'transactions': transactions,
+        'avg_order': totals['revenue'] / orders,
+        'units_per_order': totals['units_sold'] / orders
+    }
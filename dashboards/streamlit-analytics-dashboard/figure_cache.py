@@ -0,0 +1,96 @@
+"""
+Figure Cache
+Serialized Plotly figure specs keyed by a content hash of each chart's input.
+
+Reruns that do not change a chart's aggregate (toggling columns, clicking
+an export button) reuse the cached JSON spec instead of rebuilding the
+figure and re-encoding it.
+"""
+
+import hashlib
+import json
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from memory import MemoryBudgetCache
+
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+# render_spec and loaders.attach_cache_context use Streamlit internals as they are
+# in this release (pinned in requirements.txt); other versions take the public API
+STREAMLIT_INTERNALS_VERSION = "1.31.1"
+
+FigureTiming = namedtuple('FigureTiming', ['name', 'build_seconds', 'serialize_seconds', 'cached'])
+
+
+def content_hash(data) -> str:
+    """Stable hash of a DataFrame's labels, dtypes and values"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(data.columns), [str(dtype) for dtype in data.dtypes], data.shape)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Bounded LRU cache of Plotly JSON specs with per-figure build/serialize timings"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self._specs = MemoryBudgetCache(budget_bytes)
+
+    def get_spec(self, name: str, data: pd.DataFrame, build, *args):
+        """
+        Return (spec, timing) for a figure built by ``build(data, *args)``.
+
+        The key covers the figure name, the extra builder arguments and the
+        content of ``data``, so identical charts are built and encoded once.
+        """
+        import plotly.io
+
+        key = (name, args, content_hash(data))
+        spec = self._specs.get(key)
+        if spec is not None:
+            return spec, FigureTiming(name, 0.0, 0.0, True)
+
+        started = time.perf_counter()
+        figure = build(data, *args)
+        built = time.perf_counter()
+        spec = plotly.io.to_json(figure, validate=False)
+        serialized = time.perf_counter()
+
+        self._specs.put(key, spec, size=len(spec))
+        return spec, FigureTiming(name, built - started, serialized - built, False)
+
+    def usage(self) -> dict:
+        return self._specs.usage()
+
+
+def streamlit_internals_supported() -> bool:
+    """Whether the installed Streamlit is the release our internal API use was written for"""
+    import streamlit
+    return streamlit.__version__ == STREAMLIT_INTERNALS_VERSION
+
+
+def render_spec(container, spec: str, use_container_width: bool = True):
+    """
+    Draw a pre-serialized Plotly spec.
+
+    On the pinned Streamlit release this fills the same message ``st.plotly_chart``
+    sends, minus its figure validation and JSON encoding. On any other release, or
+    if that fails for any reason, the spec is decoded and drawn with ``plotly_chart``.
+    """
+    if streamlit_internals_supported():
+        try:
+            from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+
+            proto = PlotlyChartProto()
+            proto.use_container_width = use_container_width
+            proto.figure.spec = spec
+            proto.figure.config = json.dumps({"showLink": False, "linkText": False})
+            proto.theme = "streamlit"
+            return container._enqueue("plotly_chart", proto)
+        except Exception:
+            pass
+    import plotly.io
+    return container.plotly_chart(plotly.io.from_json(spec), use_container_width=use_container_width)
@@ -0,0 +1,168 @@
+"""
+Columnar Ingestion
+Loads sales_data from Supabase as CSV pages parsed straight into typed
+columns, so no per-row Python dicts are created on the way to the frame.
+"""
+
+import re
+from io import BytesIO
+
+import pandas as pd
+
+# Declared schema for sales_data (database/setup.sql)
+SALES_SCHEMA = {
+    'id': 'int64',
+    'date': 'date',
+    'region': 'string',
+    'product': 'string',
+    'category': 'string',
+    'revenue': 'float64',
+    'units_sold': 'int64',
+    'customer_id': 'string',
+    'profit_margin': 'float64',
+    'profit': 'float64',
+    # Kept as text, as the row-by-row JSON load did, so exports are unchanged
+    'created_at': 'string'
+}
+# Loaded when present; the sample data and rows from the local live stand-in have none
+OPTIONAL_COLUMNS = {'created_at'}
+
+# Supabase caps each PostgREST response at 1000 rows by default
+DEFAULT_PAGE_SIZE = 1000
+
+
+class SchemaError(ValueError):
+    """Raised when a response does not match the declared sales_data schema"""
+
+
+def has_arrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def check_header(payload: bytes) -> list:
+    """Declared columns in a CSV page; raise SchemaError if a required one is missing"""
+    header = payload.split(b'\n', 1)[0].decode().strip().split(',')
+    missing = [column for column in SALES_SCHEMA if column not in header and column not in OPTIONAL_COLUMNS]
+    if missing:
+        raise SchemaError(f"sales_data response is missing columns: {', '.join(missing)}")
+    return [column for column in SALES_SCHEMA if column in header]
+
+
+def read_csv_table(payload: bytes):
+    """Parse one CSV page into an Arrow table typed by SALES_SCHEMA"""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    arrow_types = {
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        'date': pa.timestamp('ns')
+    }
+    columns = check_header(payload)
+    try:
+        return pa_csv.read_csv(
+            BytesIO(payload),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={column: arrow_types[SALES_SCHEMA[column]] for column in columns},
+                include_columns=columns,
+                strings_can_be_null=False
+            )
+        )
+    except pa.ArrowInvalid as e:
+        raise SchemaError(f"sales_data response does not match the schema: {str(e)}") from e
+
+
+def table_to_frame(table) -> pd.DataFrame:
+    """Convert an Arrow table to pandas, keeping strings Arrow-backed"""
+    import pyarrow as pa
+
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get,
+        self_destruct=True
+    )
+
+
+def read_csv_frame(payload: bytes) -> pd.DataFrame:
+    """Parse one CSV page with the pandas C parser (used when pyarrow is not installed)"""
+    columns = check_header(payload)
+    dtypes = {column: ('object' if SALES_SCHEMA[column] == 'string' else SALES_SCHEMA[column])
+              for column in columns if SALES_SCHEMA[column] != 'date'}
+    try:
+        return pd.read_csv(BytesIO(payload), usecols=columns, dtype=dtypes, parse_dates=['date'])
+    except ValueError as e:
+        raise SchemaError(f"sales_data response does not match the schema: {str(e)}") from e
+
+
+def csv_to_frame(pages) -> pd.DataFrame:
+    """Build one typed frame from CSV page payloads"""
+    pages = [page for page in pages if page.strip()]
+    if not pages:
+        return empty_sales_frame()
+
+    if has_arrow():
+        import pyarrow as pa
+        table = pa.concat_tables([read_csv_table(page) for page in pages])
+        return table_to_frame(table.combine_chunks())
+    return pd.concat([read_csv_frame(page) for page in pages], ignore_index=True)
+
+
+def empty_sales_frame() -> pd.DataFrame:
+    """Empty frame with the declared dtypes"""
+    dtypes = {'date': 'datetime64[ns]', 'string': 'object'}
+    return pd.DataFrame({
+        column: pd.Series(dtype=dtypes.get(kind, kind)) for column, kind in SALES_SCHEMA.items()
+    })
+
+
+def page_rows(content_range: str, payload: bytes) -> int:
+    """Rows in a page, from PostgREST's Content-Range ("0-999/*") or the line count"""
+    match = re.match(r'\s*(\d+)-(\d+)/', content_range)
+    if match:
+        return int(match.group(2)) - int(match.group(1)) + 1
+    if content_range.strip().startswith('*'):
+        return 0
+    # Header line plus one line per row
+    return max(payload.count(b'\n') + (not payload.endswith(b'\n')) - 1, 0)
+
+
+def last_row_id(payload: bytes) -> int:
+    """id of the last row in a CSV page (id is the first selected column)"""
+    return int(payload.rstrip(b'\r\n').rsplit(b'\n', 1)[-1].split(b',', 1)[0])
+
+
+def fetch_csv_pages(client, page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    Yield sales_data as raw CSV pages, ordered by id.
+
+    Pages are keyset-paged (id > last id seen), so each page is an index range
+    scan on the primary key instead of an OFFSET that re-reads all earlier rows.
+    Paging stops at the first empty page: a short page is not the end when the
+    project's max-rows is below ``page_size``.
+    """
+    session = client.postgrest.session
+    params = {'select': ','.join(SALES_SCHEMA), 'order': 'id', 'limit': page_size}
+
+    last_id = None
+    while True:
+        response = session.get(
+            '/sales_data',
+            params=params if last_id is None else dict(params, id=f'gt.{last_id}'),
+            headers={'Accept': 'text/csv'}
+        )
+        response.raise_for_status()
+        payload = response.content
+
+        if not page_rows(response.headers.get('content-range', ''), payload):
+            break
+        yield payload
+        last_id = last_row_id(payload)
+
+
+def fetch_sales_frame(client, page_size: int = DEFAULT_PAGE_SIZE) -> pd.DataFrame:
+    """Fetch sales_data through PostgREST as CSV and build the frame column by column"""
+    return csv_to_frame(fetch_csv_pages(client, page_size))
@@ -0,0 +1,376 @@
+"""
+Live Updates
+Applies rows inserted into sales_data to a live copy of the cached dataset
+and aggregates as they arrive, and wakes the sessions showing live KPIs.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from date_index import period_kpis
+from ingest import OPTIONAL_COLUMNS, SALES_SCHEMA, SchemaError
+
+# How often a live session checks for inserts and refreshes its status line
+REFRESH_SECONDS = 1.0
+DEFAULT_STREAM_SECONDS = 3600
+# The subscription stops once no session has read the feed for this long
+IDLE_STOP_SECONDS = 30
+# Inserts kept as rows until the next reload; older ones stay in the KPIs but leave the tail
+MAX_BUFFERED_ROWS = 100000
+
+
+def stream_seconds_from_env() -> float:
+    """How long a session keeps streaming after its last interaction (LIVE_UPDATES_MAX_SECONDS)"""
+    value = os.environ.get("LIVE_UPDATES_MAX_SECONDS", "")
+    return float(value) if value.strip() else DEFAULT_STREAM_SECONDS
+
+
+def normalize_record(record: dict) -> dict:
+    """Coerce an inserted row to the declared sales_data types"""
+    row = {}
+    for column, kind in SALES_SCHEMA.items():
+        value = record.get(column)
+        if value is None:
+            if column == 'id' or column in OPTIONAL_COLUMNS:
+                continue
+            raise SchemaError(f"inserted row is missing column: {column}")
+
+        if kind == 'date':
+            row[column] = pd.Timestamp(value)
+        elif kind == 'int64':
+            row[column] = int(value)
+        elif kind == 'float64':
+            row[column] = float(value)
+        else:
+            row[column] = str(value)
+    return row
+
+
+class LiveFeed:
+    """
+    Live copy of the dataset, date index and customer sketches.
+
+    Each insert is appended to a bounded row buffer, added to the prefix sums
+    of its cell and folded into its cell's HyperLogLog overlay, so the cost of
+    an event does not depend on the number of rows already loaded. Readers get
+    the buffered rows as a small tail frame next to the shared base, which is
+    never copied.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.version = 0
+        self.events = 0
+        self.last_event_at = None
+        self.error = None
+        self.dropped = 0
+        self.index = None
+        self._index_shared = False
+        self.sketches = None
+        self._base = None
+        self._rows = []
+        self._simulated = []
+        self._tail = (None, None, None)
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_used = time.monotonic()
+
+    def start(self):
+        """Subscribe to the source on a background thread, again if it stopped while idle"""
+        with self._condition:
+            self._last_used = time.monotonic()
+            if self._thread is None or self._stop.is_set():
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name="live-feed", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, stop: threading.Event):
+        threading.Thread(target=self._stop_when_idle, args=(stop,), name="live-feed-idle", daemon=True).start()
+        try:
+            self.source.run(self._receive, stop)
+        except Exception as e:
+            self.error = str(e)
+
+    def _stop_when_idle(self, stop: threading.Event):
+        # Inserts made while stopped arrive with the next reload of the dataset
+        while not stop.wait(REFRESH_SECONDS):
+            if time.monotonic() - self._last_used > IDLE_STOP_SECONDS:
+                stop.set()
+
+    def _receive(self, record: dict, simulated: bool = False):
+        try:
+            self.apply(record, simulated)
+        except (SchemaError, ValueError, TypeError) as e:
+            self.error = f"Skipped insert: {str(e)}"
+
+    def attach(self, base: pd.DataFrame, index, sketches):
+        """
+        Patch a (re)loaded dataset. Inserts the new base does not contain yet
+        are replayed onto copies of its index and sketches. The index is only
+        copied once an insert arrives; until then the feed shares it.
+        """
+        with self._condition:
+            if base is self._base:
+                return self
+
+            # A reload holds every persisted insert up to its newest id. Rows
+            # without an id come from the local stand-in and are not persisted.
+            newest = base['id'].max() if 'id' in base.columns and len(base) else None
+            pending = [
+                (row, simulated) for row, simulated in zip(self._rows, self._simulated)
+                if 'id' in row and (newest is None or row['id'] > newest)
+            ]
+
+            self._base = base
+            self.index = index
+            self._index_shared = True
+            self.sketches = sketches.copy()
+            self._rows, self._simulated, self.dropped = [], [], 0
+            for row, simulated in pending:
+                self._apply(row, simulated)
+
+            self.version += 1
+            self._condition.notify_all()
+        return self
+
+    def apply(self, record: dict, simulated: bool = False):
+        """Apply one inserted row and wake the waiting sessions"""
+        row = normalize_record(record)
+        with self._condition:
+            self._apply(row, simulated)
+            self.events += 1
+            self.last_event_at = time.time()
+            self.version += 1
+            self._condition.notify_all()
+
+    def _apply(self, row: dict, simulated: bool = False):
+        self._rows.append(row)
+        self._simulated.append(simulated)
+        if len(self._rows) > MAX_BUFFERED_ROWS:
+            # Trim in chunks so the list is not shifted on every insert
+            excess = len(self._rows) - MAX_BUFFERED_ROWS * 9 // 10
+            del self._rows[:excess], self._simulated[:excess]
+            self.dropped += excess
+        if self.index is not None:
+            if self._index_shared:
+                self.index = self.index.copy()
+                self._index_shared = False
+            self.index.add(row)
+            self.sketches.add(row)
+
+    def wait(self, version: int, timeout: float = None) -> int:
+        """Block until the feed moves past ``version`` or the timeout passes; return the current version"""
+        with self._condition:
+            self._last_used = time.monotonic()
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def dashboard(self, start_date, end_date, regions=None, products=None, categories=None) -> dict:
+        """KPIs and chart aggregates for a filter, including every insert applied so far"""
+        filters = {'regions': regions, 'products': products, 'categories': categories}
+        with self._condition:
+            self._last_used = time.monotonic()
+            index = self.index
+            grand_total = index.totals(index.start, index.end) if index.start is not None else {'revenue': 0.0}
+            return {
+                'version': self.version,
+                'kpis': period_kpis(index.totals(start_date, end_date, **filters)),
+                'grand_total_revenue': grand_total['revenue'],
+                'aggregates': index.aggregates(start_date, end_date, **filters)
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the feed's own copy of the date index (0 while it is shared)"""
+        return 0 if self.index is None or self._index_shared else self.index.nbytes
+
+    def unique_customers(self, **filters) -> float:
+        with self._condition:
+            return self.sketches.unique_customers(**filters)
+
+    def snapshot(self) -> tuple:
+        """
+        (base, version, tail, simulated): the attached dataset, the inserts
+        applied since as a small frame, and which tail rows are simulated.
+        The tail is built at most once per version; the base is never copied.
+        """
+        with self._condition:
+            self._last_used = time.monotonic()
+            base, version = self._base, self.version
+            tail_version, tail, simulated = self._tail
+            if tail_version == version:
+                return base, version, tail, simulated
+            rows, simulated = list(self._rows), np.array(self._simulated, dtype=bool)
+
+        tail = pd.DataFrame(rows).reindex(columns=base.columns) if rows else base.iloc[:0]
+        tail = tail.astype({column: base[column].dtype for column in base.columns if tail[column].notna().all()})
+
+        with self._condition:
+            self._tail = (version, tail, simulated)
+        return base, version, tail, simulated
+
+    def status(self) -> dict:
+        return {
+            'source': self.source.name,
+            'events': self.events,
+            'dropped': self.dropped,
+            'last_event_at': self.last_event_at,
+            'error': self.error or self.source.error
+        }
+
+
+class LocalInsertSource:
+    """
+    In-process stand-in for the database insert stream.
+
+    ``publish`` queues a row as if it had been inserted. With
+    ``rows_per_second`` set, made-up rows resembling the ``template`` data
+    are generated as well, dated on its latest day, and flagged as simulated.
+    """
+
+    name = "local"
+
+    def __init__(self, template: pd.DataFrame = None, rows_per_second: float = 0.0, seed: int = None):
+        self.template = template
+        self.rows_per_second = rows_per_second
+        self.error = None
+        self._queue = queue.Queue()
+        self._rng = np.random.default_rng(seed)
+        self._latest = template['date'].max() if template is not None and len(template) else None
+
+    def publish(self, record: dict):
+        self._queue.put(record)
+
+    def run(self, emit, stop: threading.Event):
+        simulate = self.rows_per_second > 0 and self._latest is not None
+        interval = 1 / self.rows_per_second if simulate else REFRESH_SECONDS
+        next_row_at = time.monotonic() + interval
+
+        while not stop.is_set():
+            try:
+                emit(self._queue.get(timeout=max(next_row_at - time.monotonic(), 0)))
+                continue
+            except queue.Empty:
+                pass
+            if simulate:
+                emit(self.simulated_row(), simulated=True)
+            next_row_at += interval
+
+    def simulated_row(self) -> dict:
+        """A new row for a random (region, product, category, customer) in the template"""
+        row = self.template.iloc[int(self._rng.integers(len(self.template)))]
+        revenue = float(self._rng.uniform(1000, 50000))
+        margin = float(self._rng.uniform(0.15, 0.45))
+        return {
+            'date': self._latest,
+            'region': row['region'],
+            'product': row['product'],
+            'category': row['category'],
+            'revenue': revenue,
+            'units_sold': int(self._rng.integers(1, 100)),
+            'customer_id': row['customer_id'],
+            'profit_margin': margin,
+            'profit': revenue * margin
+        }
+
+
+def insert_record(message: dict):
+    """The inserted row in a Realtime postgres_changes message (None for any other message)"""
+    if message.get('event') != 'postgres_changes':
+        return None
+    data = message.get('payload', {}).get('data', {})
+    if data.get('type') != 'INSERT':
+        return None
+    return data.get('record')
+
+
+class SupabaseRealtimeSource:
+    """
+    Inserts on sales_data from Supabase Realtime.
+
+    Speaks the Realtime websocket protocol directly: one channel joined with
+    a postgres_changes INSERT filter, plus the Phoenix heartbeat. The table
+    must be in the supabase_realtime publication (see database/setup.sql).
+    """
+
+    name = "supabase realtime"
+    HEARTBEAT_SECONDS = 25
+    RECONNECT_SECONDS = 5
+
+    def __init__(self, url: str, key: str, table: str = 'sales_data', schema: str = 'public'):
+        base = url.rstrip('/').replace('https://', 'wss://', 1).replace('http://', 'ws://', 1)
+        self.socket_url = f"{base}/realtime/v1/websocket?apikey={key}&vsn=1.0.0"
+        self.key = key
+        self.table = table
+        self.schema = schema
+        self.error = None
+
+    def join_message(self) -> dict:
+        return {
+            'topic': f"realtime:{self.table}-inserts",
+            'event': 'phx_join',
+            'payload': {
+                'config': {
+                    'broadcast': {'self': False},
+                    'presence': {'key': ''},
+                    'postgres_changes': [{'event': 'INSERT', 'schema': self.schema, 'table': self.table}]
+                },
+                'access_token': self.key
+            },
+            'ref': '1'
+        }
+
+    def run(self, emit, stop: threading.Event):
+        asyncio.run(self._listen(emit, stop))
+
+    async def _listen(self, emit, stop):
+        import websockets
+
+        while not stop.is_set():
+            try:
+                async with websockets.connect(self.socket_url) as socket:
+                    await socket.send(json.dumps(self.join_message()))
+                    heartbeat = asyncio.create_task(self._heartbeat(socket))
+                    try:
+                        await self._receive(socket, emit, stop)
+                    finally:
+                        heartbeat.cancel()
+            except (OSError, websockets.WebSocketException) as e:
+                self.error = f"Realtime connection: {str(e)}"
+                await asyncio.sleep(self.RECONNECT_SECONDS)
+
+    async def _receive(self, socket, emit, stop):
+        while not stop.is_set():
+            try:
+                message = json.loads(await asyncio.wait_for(socket.recv(), timeout=REFRESH_SECONDS))
+            except asyncio.TimeoutError:
+                continue
+
+            payload = message.get('payload', {})
+            if message.get('event') == 'phx_reply' and payload.get('status') == 'error':
+                self.error = f"Realtime subscription: {payload.get('response')}"
+                continue
+
+            record = insert_record(message)
+            if record is not None:
+                self.error = None
+                emit(record)
+
+    async def _heartbeat(self, socket):
+        ref = 0
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_SECONDS)
+            ref += 1
+            await socket.send(json.dumps({'topic': 'phoenix', 'event': 'heartbeat', 'payload': {}, 'ref': f"hb-{ref}"}))
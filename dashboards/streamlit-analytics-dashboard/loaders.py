@@ -0,0 +1,252 @@
+"""
+Data Loaders
+Cached loaders shared by the dashboard, the warmup hook and other entry points.
+
+The cached functions live in their own module so every caller - a Streamlit
+session, the server-start warmup thread - hits the same cache entries.
+"""
+
+import asyncio
+import itertools
+import os
+
+import pandas as pd
+import streamlit as st
+
+from data_layer import FrameBackend, SupabaseBackend, make_filters, fetch_dimensions, fetch_dashboard
+from date_index import PrefixSumIndex
+from sampling import stratified_sample
+from customer_analytics import CustomerSketchStore
+from memory import MemoryBudgetCache, enable_copy_on_write, estimate_size
+from figure_cache import FigureCache, streamlit_internals_supported
+from ingest import fetch_sales_frame
+from live import LiveFeed, LocalInsertSource, SupabaseRealtimeSource
+
+# Sessions share one base frame; copy-on-write keeps their views zero-copy
+enable_copy_on_write()
+
+# Every load gets a new version number, so caches keyed on it never serve results
+# of an earlier dataset (id() of a freed frame is reused by the next one)
+_dataset_versions = itertools.count(1)
+
+def stamp_version(df: pd.DataFrame) -> pd.DataFrame:
+    df.attrs['dataset_version'] = next(_dataset_versions)
+    return df
+
+def dataset_version(df: pd.DataFrame) -> int:
+    """Version of a frame returned by load_data()"""
+    return df.attrs['dataset_version']
+
+def data_source(df: pd.DataFrame) -> str:
+    """Where a frame returned by load_data() came from: 'supabase' or 'sample'"""
+    return df.attrs['source']
+
+# Initialize Supabase client
+@st.cache_resource
+def init_supabase():
+    url = os.environ.get("SUPABASE_URL", "")
+    key = os.environ.get("SUPABASE_KEY", "")
+    
+    if url and key:
+        from supabase import create_client
+        return create_client(url, key)
+    return None
+
+# Load data from Supabase (paged CSV parsed into typed columns) or use sample data
+# (cache_resource keeps a single shared base frame instead of a copy per caller)
+@st.cache_resource(ttl=600)
+def load_data():
+    supabase = init_supabase()
+    
+    # Try to load from Supabase
+    if supabase:
+        try:
+            df = fetch_sales_frame(supabase)
+            if not df.empty:
+                df.attrs['source'] = 'supabase'
+                return stamp_version(df)
+            st.warning("Using sample data. Supabase table sales_data is empty")
+        except Exception as e:
+            st.warning(f"Using sample data. Supabase connection: {str(e)}")
+    
+    # Generate sample data if Supabase is not configured
+    df = generate_sample_data()
+    df.attrs['source'] = 'sample'
+    return stamp_version(df)
+
+# Everything derived from the dataset is cached per dataset version. Each public
+# loader passes the current version to a private cached builder (the frame itself
+# goes in as an unhashed ``_df`` argument); max_entries=1 drops the previous
+# dataset's result, and with it the last reference to the old frame, on reload.
+
+# Data-layer backend: push queries down to Supabase or answer them from the loaded frame.
+# Follows what load_data() actually loaded, so a fallback to sample data is never
+# mixed with aggregates pushed down to Supabase
+def get_backend():
+    df = load_data()
+    return _build_backend(dataset_version(df), df)
+
+@st.cache_resource(max_entries=1)
+def _build_backend(version, _df):
+    if data_source(_df) == 'supabase':
+        return SupabaseBackend(init_supabase())
+    return FrameBackend(_df, get_memory_cache(), version)
+
+def local_backend():
+    """Backend answering from the loaded frame, used when a Supabase query fails"""
+    df = load_data()
+    return FrameBackend(df, get_memory_cache(), dataset_version(df))
+
+# Sidebar options and date bounds, fetched concurrently
+def load_dimensions():
+    return _fetch_dimensions(dataset_version(load_data()))
+
+@st.cache_data(max_entries=2)
+def _fetch_dimensions(version):
+    try:
+        return asyncio.run(fetch_dimensions(get_backend()))
+    except Exception as e:
+        st.warning(f"Using local data for filters. Supabase query: {str(e)}")
+        return asyncio.run(fetch_dimensions(local_backend()))
+
+# KPIs, chart aggregates and the first page of detail rows, fetched concurrently
+def load_dashboard(start_date, end_date, regions, products, categories):
+    return _fetch_dashboard(dataset_version(load_data()), start_date, end_date, regions, products, categories)
+
+@st.cache_data(max_entries=64)
+def _fetch_dashboard(version, start_date, end_date, regions, products, categories):
+    filters = make_filters(start_date, end_date, regions, products, categories)
+    try:
+        return asyncio.run(fetch_dashboard(get_backend(), filters))
+    except Exception as e:
+        st.warning(f"Using local data for aggregates. Supabase query: {str(e)}")
+        return asyncio.run(fetch_dashboard(local_backend(), filters))
+
+# Daily prefix sums for constant-time range KPIs and comparison periods
+def load_date_index():
+    df = load_data()
+    return _build_date_index(dataset_version(df), df)
+
+@st.cache_resource(max_entries=1)
+def _build_date_index(version, _df):
+    return PrefixSumIndex.from_frame(_df)
+
+# Budgeted LRU cache for filter results and export artifacts, shared by all sessions
+@st.cache_resource
+def get_memory_cache():
+    return MemoryBudgetCache()
+
+# Bounded cache of serialized chart specs, shared by all sessions
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# Size of the shared base frame, measured once per dataset
+def load_data_size():
+    df = load_data()
+    return _measure_data_size(dataset_version(df), df)
+
+@st.cache_resource(max_entries=1)
+def _measure_data_size(version, _df):
+    return estimate_size(_df)
+
+# Build per-cell HyperLogLog sketches of customer_id once per dataset
+def load_customer_sketches():
+    df = load_data()
+    return _build_customer_sketches(dataset_version(df), df)
+
+@st.cache_resource(max_entries=1)
+def _build_customer_sketches(version, _df):
+    return CustomerSketchStore.from_frame(_df)
+
+# Stratified sample kept alongside the loaded dataset for fast previews
+def load_sample():
+    df = load_data()
+    return _build_sample(dataset_version(df), df)
+
+@st.cache_resource(max_entries=1)
+def _build_sample(version, _df):
+    return stratified_sample(_df)
+
+# Live insert feed; one subscription per server, started when a session turns live updates on
+# and stopped again once no session has read it for live.IDLE_STOP_SECONDS
+@st.cache_resource
+def get_live_feed():
+    return LiveFeed(live_source())
+
+def live_source():
+    """Supabase Realtime when configured, otherwise the local stand-in (LIVE_UPDATES_SOURCE=local forces it)"""
+    url = os.environ.get("SUPABASE_URL", "")
+    key = os.environ.get("SUPABASE_KEY", "")
+    
+    if url and key and os.environ.get("LIVE_UPDATES_SOURCE", "supabase") != "local":
+        return SupabaseRealtimeSource(url, key)
+    
+    rate = os.environ.get("LIVE_SIMULATED_ROWS_PER_SECOND", "")
+    return LocalInsertSource(load_data(), rows_per_second=float(rate) if rate.strip() else 0.0)
+
+def attach_cache_context():
+    """
+    Let the current non-session thread (warmup, API server) read and write the
+    shared caches. Streamlit only stores cached results for threads with a
+    script run context, so this attaches an empty one when there is none.
+
+    ScriptRunContext is internal to Streamlit; on any release other than the
+    pinned one, or if building it fails, the thread is left as is and its
+    loads run uncached.
+    """
+    if not streamlit_internals_supported():
+        return
+    try:
+        from streamlit.runtime.scriptrunner import ScriptRunContext, add_script_run_ctx, get_script_run_ctx
+        from streamlit.runtime.state import SafeSessionState, SessionState
+
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            return
+        ctx = ScriptRunContext(
+            session_id="background",
+            _enqueue=lambda msg: None,
+            query_string="",
+            session_state=SafeSessionState(SessionState(), lambda: None),
+            uploaded_file_mgr=None,
+            main_script_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+            page_script_hash="",
+            user_info={'email': None}
+        )
+        add_script_run_ctx(ctx=ctx)
+    except Exception:
+        return
+
+def load_live_feed():
+    """The live feed, patching the currently cached dataset"""
+    return get_live_feed().start().attach(load_data(), load_date_index(), load_customer_sketches())
+
+def generate_sample_data():
+    """Generate realistic sample sales data"""
+    import numpy as np
+    
+    np.random.seed(42)
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+    
+    regions = ['North America', 'Europe', 'Asia Pacific', 'Latin America', 'Middle East']
+    products = ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
+    categories = ['Electronics', 'Software', 'Services', 'Hardware', 'Accessories']
+    
+    data = []
+    for date in dates:
+        for _ in range(np.random.randint(3, 8)):
+            data.append({
+                'date': date,
+                'region': np.random.choice(regions),
+                'product': np.random.choice(products),
+                'category': np.random.choice(categories),
+                'revenue': np.random.uniform(1000, 50000),
+                'units_sold': np.random.randint(1, 100),
+                'customer_id': f'CUST-{np.random.randint(1000, 9999)}'
+            })
+    
+    df = pd.DataFrame(data)
+    df['profit_margin'] = np.random.uniform(0.15, 0.45, len(df))
+    df['profit'] = df['revenue'] * df['profit_margin']
+    
+    return df
@@ -0,0 +1,135 @@
+"""
+Memory Governance
+Shared LRU cache with a memory budget for filter results and export artifacts.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+DEFAULT_BUDGET_MB = 256
+
+
+def budget_from_env() -> int:
+    """Cache budget in bytes from CACHE_MEMORY_BUDGET_MB (default 256 MB)"""
+    value = os.environ.get("CACHE_MEMORY_BUDGET_MB", "")
+    megabytes = float(value) if value.strip() else DEFAULT_BUDGET_MB
+    return int(megabytes * 1024 * 1024)
+
+
+def estimate_size(value) -> int:
+    """Approximate memory held by a cached value, in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, BytesIO):
+        return value.getbuffer().nbytes
+    if isinstance(value, dict):
+        return sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def process_rss() -> int:
+    """Resident set size of this process in bytes (None if unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+def enable_copy_on_write():
+    """Make shallow copies lazy so session views never mutate the shared frame"""
+    pd.set_option('mode.copy_on_write', True)
+
+
+def session_view(df: pd.DataFrame) -> pd.DataFrame:
+    """Zero-copy view of the shared base frame (writes copy, the base is untouched)"""
+    return df.copy(deep=False)
+
+
+class MemoryBudgetCache:
+    """Thread-safe LRU cache that evicts entries to stay under a byte budget"""
+
+    def __init__(self, budget_bytes: int = None):
+        self.budget_bytes = budget_from_env() if budget_bytes is None else budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value, size: int = None):
+        """Store a value; values larger than the whole budget are not cached"""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            if size > self.budget_bytes:
+                return value
+
+            self._entries[key] = (value, size)
+            self.used_bytes += size
+            while self.used_bytes > self.budget_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, building and storing it on a miss"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.put(key, factory())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def usage(self) -> dict:
+        """Current cache usage and counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'used_bytes': self.used_bytes,
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,113 @@
+"""
+Sampling
+Stratified sample of the sales data and KPI estimates with confidence ranges.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# z-score for a 95% confidence range
+Z_95 = 1.96
+
+Estimate = namedtuple('Estimate', ['value', 'margin'])
+
+
+def stratified_sample(df: pd.DataFrame, fraction: float = 0.05, min_per_stratum: int = 2, seed: int = 42):
+    """
+    Draw a random sample stratified by (date, region).
+
+    Every stratum keeps at least ``min_per_stratum`` rows (or all of them if
+    it is smaller). Each sampled row carries its expansion weight in
+    ``_weight`` and its stratum sizes so estimates can be computed without
+    touching the full frame again.
+    """
+    strata = df.groupby(
+        [df['date'].dt.normalize(), df['region']], sort=False, observed=True
+    ).ngroup().to_numpy()
+    sizes = np.bincount(strata)
+    targets = np.minimum(sizes, np.maximum(np.ceil(sizes * fraction), min_per_stratum)).astype(np.int64)
+
+    # Rank rows in a random order inside each stratum and keep the first n_h
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(df)), strata))
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    ranks = np.arange(len(df)) - starts[strata[order]]
+    chosen = np.sort(order[ranks < targets[strata[order]]])
+
+    sample = df.iloc[chosen].copy()
+    chosen_strata = strata[chosen]
+    sample['_stratum'] = chosen_strata
+    sample['_stratum_size'] = sizes[chosen_strata]
+    sample['_stratum_sample'] = targets[chosen_strata]
+    sample['_weight'] = sample['_stratum_size'] / sample['_stratum_sample']
+    return sample
+
+
+def _estimate_totals(sample: pd.DataFrame, values: pd.DataFrame) -> dict:
+    """Stratified totals and standard errors for each column of ``values``"""
+    grouped = values.groupby(sample['_stratum'].to_numpy())
+    variances = grouped.var(ddof=1).fillna(0.0)
+    sizes = sample.groupby('_stratum')[['_stratum_size', '_stratum_sample']].first().loc[variances.index]
+
+    population = sizes['_stratum_size'].to_numpy(dtype=float)
+    drawn = sizes['_stratum_sample'].to_numpy(dtype=float)
+    factor = population ** 2 * (1 - drawn / population) / drawn
+
+    weights = sample['_weight'].to_numpy()
+    results = {}
+    for column in values.columns:
+        total = float(np.dot(values[column].to_numpy(dtype=float), weights))
+        variance = float(np.dot(factor, variances[column].to_numpy()))
+        results[column] = (total, np.sqrt(variance))
+    return results
+
+
+def estimate_kpis(sample: pd.DataFrame, mask) -> dict:
+    """
+    Estimate the dashboard KPIs for the rows selected by ``mask``.
+
+    Totals use the stratified (Horvitz-Thompson) estimator; averages are
+    ratio estimates with linearized standard errors. Each KPI is returned
+    as an ``Estimate`` whose margin is the half-width of a 95% range.
+    """
+    mask = np.asarray(mask, dtype=float)
+    domain = pd.DataFrame({
+        'revenue': sample['revenue'].to_numpy() * mask,
+        'profit': sample['profit'].to_numpy() * mask,
+        'units_sold': sample['units_sold'].to_numpy() * mask,
+        'profit_margin': sample['profit_margin'].to_numpy() * mask,
+        'transactions': mask
+    })
+    totals = _estimate_totals(sample, domain)
+    count = totals['transactions'][0]
+
+    kpis = {
+        'total_revenue': Estimate(totals['revenue'][0], Z_95 * totals['revenue'][1]),
+        'total_profit': Estimate(totals['profit'][0], Z_95 * totals['profit'][1]),
+        'total_units': Estimate(totals['units_sold'][0], Z_95 * totals['units_sold'][1]),
+        'transactions': Estimate(count, Z_95 * totals['transactions'][1])
+    }
+
+    if count <= 0:
+        for name in ('avg_order', 'units_per_order', 'avg_margin'):
+            kpis[name] = Estimate(float('nan'), float('nan'))
+        return kpis
+
+    # Ratio estimates per transaction, linearized around the estimated ratio
+    ratios = {
+        'avg_order': totals['revenue'][0] / count,
+        'units_per_order': totals['units_sold'][0] / count,
+        'avg_margin': totals['profit_margin'][0] / count
+    }
+    sources = {'avg_order': 'revenue', 'units_per_order': 'units_sold', 'avg_margin': 'profit_margin'}
+    linearized = pd.DataFrame({
+        name: (domain[sources[name]] - ratio * domain['transactions']) / count
+        for name, ratio in ratios.items()
+    })
+    errors = _estimate_totals(sample, linearized)
+    for name, ratio in ratios.items():
+        kpis[name] = Estimate(ratio, Z_95 * errors[name][1])
+
+    return kpis
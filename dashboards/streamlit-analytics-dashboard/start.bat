@@ -80,5 +80,5 @@ echo.
 echo Press Ctrl+C to stop the server
 echo.
 
-REM Run Streamlit
-streamlit run app.py
+REM Run Streamlit (warmup.py preloads data and caches at server start)
+python warmup.py
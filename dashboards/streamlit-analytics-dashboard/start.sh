@@ -79,5 +79,5 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-# Run Streamlit
-streamlit run app.py
+# Run Streamlit (warmup.py preloads data and caches at server start)
+python3 warmup.py
@@ -2,9 +2,26 @@
 """
 Installation Verification Script
 Tests that all dependencies are properly installed and configured.
+
+With --probe, also measures whether this machine can serve the current data
+volume: backend latency, fetch throughput, memory footprint and the time of
+a filter and aggregate pass, ending with a recommended loading strategy.
+
+Usage:
+    python verify_setup.py [--probe] [--rows 5000000]
 """
 
+import argparse
+import os
+import statistics
 import sys
+import time
+
+# Capacity targets behind the --probe recommendation
+LOAD_TARGET_SECONDS = 30        # cold load; the dataset is reloaded every 10 minutes (cache TTL)
+INTERACTIVE_SECONDS = 1.0       # filter and aggregate pass on each rerun
+PUSHDOWN_LATENCY_SECONDS = 1.0  # one dashboard view answered by Supabase
+MEMORY_HEADROOM = 0.5           # share of available memory the dashboard may use
 
 def check_python_version():
     """Check Python version"""
@@ -129,6 +146,296 @@ def test_data_generation():
         print(f"   ❌ Failed: {str(e)}")
         return False
 
+def format_bytes(size):
+    """Human-readable byte count"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+def available_memory():
+    """Memory available to new allocations in bytes (None if unknown)"""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def peak_rss():
+    """Resident memory high-water mark since the last reset_peak_rss() (Linux only)"""
+    try:
+        with open('/proc/self/status') as status:
+            return next(int(line.split()[1]) * 1024 for line in status if line.startswith('VmHWM'))
+    except (OSError, StopIteration):
+        return None
+
+def reset_peak_rss():
+    """Reset the high-water mark to the current resident size; False where that is not supported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def connect_supabase():
+    """Supabase client from .env, or None when not configured or unreachable"""
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not url or not key:
+        return None
+    
+    try:
+        from supabase import create_client
+        return create_client(url, key)
+    except Exception as e:
+        print(f"   ⚠️  Supabase client failed: {str(e)}")
+        return None
+
+def probe_backend(supabase, pages):
+    """Row count, round-trip latency and fetch throughput of sales_data"""
+    from itertools import islice
+    from ingest import csv_to_frame, fetch_csv_pages
+    
+    print("\n🌐 Probing Supabase...")
+    # The planner estimate is exact for small tables and cheap for large ones
+    rows = supabase.table('sales_data').select('id', count='estimated').limit(1).execute().count
+    print(f"   ℹ️  sales_data: about {rows:,} rows" if rows is not None else "   ⚠️  sales_data: row count unavailable")
+    
+    latencies = []
+    for _ in range(5):
+        started = time.perf_counter()
+        supabase.table('sales_data').select('id').limit(1).execute()
+        latencies.append(time.perf_counter() - started)
+    latency = statistics.median(latencies)
+    print(f"   ✅ Round trip: {latency * 1000:.0f} ms median ({min(latencies) * 1000:.0f}-{max(latencies) * 1000:.0f} ms)")
+    
+    started = time.perf_counter()
+    payloads = list(islice(fetch_csv_pages(supabase), pages))
+    fetch_seconds = time.perf_counter() - started
+    template = csv_to_frame(payloads)
+    fetch_rate = len(template) / fetch_seconds if len(template) else None
+    if fetch_rate:
+        print(f"   ✅ Fetch: {len(template):,} rows in {fetch_seconds:.2f}s ({fetch_rate:,.0f} rows/s, {len(payloads)} pages)")
+    
+    return {'rows': rows, 'latency': latency, 'fetch_rate': fetch_rate, 'template': template}
+
+def probe_pushdown(supabase):
+    """Time one default dashboard view answered by the database functions (None if not installed)"""
+    import asyncio
+    from data_layer import SupabaseBackend, make_filters, fetch_dashboard
+    
+    try:
+        started = time.perf_counter()
+        asyncio.run(fetch_dashboard(SupabaseBackend(supabase), make_filters()))
+        seconds = time.perf_counter() - started
+    except Exception as e:
+        print(f"   ⚠️  Pushdown queries failed (run database/setup.sql): {str(e)}")
+        return None
+    print(f"   ✅ Pushdown dashboard view: {seconds:.2f}s")
+    return seconds
+
+def sample_template():
+    """The dashboard's sample data, typed as if it had been loaded from Supabase"""
+    import logging
+    from ingest import csv_to_frame
+    
+    # Outside `streamlit run`, importing the cached loaders warns that there is no runtime
+    logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+    from loaders import generate_sample_data
+    
+    df = generate_sample_data()
+    df.insert(0, 'id', range(1, len(df) + 1))
+    return csv_to_frame([df.to_csv(index=False).encode()])
+
+def probe_memory(template, rows):
+    """Parse ``rows`` synthetic rows resampled from the template as CSV pages; measure time and memory"""
+    from ingest import DEFAULT_PAGE_SIZE, csv_to_frame
+    from memory import estimate_size
+    
+    synthetic = template.sample(rows, replace=True, random_state=42, ignore_index=True)
+    synthetic['id'] = range(1, rows + 1)
+    csv = synthetic.to_csv(index=False, date_format='%Y-%m-%d').encode()
+    del synthetic
+    header, body = csv.split(b'\n', 1)
+    lines = body.splitlines(keepends=True)
+    pages = [header + b'\n' + b''.join(lines[i:i + DEFAULT_PAGE_SIZE]) for i in range(0, len(lines), DEFAULT_PAGE_SIZE)]
+    del csv, body, lines
+    
+    measured = reset_peak_rss()
+    baseline = peak_rss()
+    started = time.perf_counter()
+    df = csv_to_frame(pages)
+    parse_seconds = time.perf_counter() - started
+    peak = peak_rss()
+    
+    frame_bytes = estimate_size(df)
+    return {
+        'frame': df,
+        'parse_rate': rows / parse_seconds,
+        'frame_bytes': frame_bytes,
+        # Without a high-water mark, assume the Arrow table and the frame briefly coexist
+        'peak_bytes': max(peak - baseline, frame_bytes) if measured and peak and baseline else 2 * frame_bytes
+    }
+
+def probe_aggregates(df):
+    """Slowest of the default view and a filtered view, as the dashboard computes them (median of 3)"""
+    import pandas as pd
+    from aggregates import apply_filters, compute_kpis, compute_aggregates
+    
+    start, end = df['date'].min(), df['date'].max()
+    views = [
+        (start, end, None, None, None),
+        (end - pd.Timedelta(days=90), end, sorted(df['region'].unique())[:2], None, None)
+    ]
+    
+    timings = []
+    for view in views:
+        runs = []
+        for _ in range(3):
+            started = time.perf_counter()
+            filtered = apply_filters(df, *view)
+            compute_kpis(filtered)
+            compute_aggregates(filtered)
+            runs.append(time.perf_counter() - started)
+        timings.append(statistics.median(runs))
+    return max(timings)
+
+def probe_derived(df):
+    """Memory and build time of the structures the dashboard always derives from the frame"""
+    from date_index import PrefixSumIndex
+    from customer_analytics import CustomerSketchStore
+    from sampling import stratified_sample
+    from memory import estimate_size
+    
+    started = time.perf_counter()
+    index = PrefixSumIndex.from_frame(df)
+    sketches = CustomerSketchStore.from_frame(df)
+    sample = stratified_sample(df)
+    return {
+        'seconds': time.perf_counter() - started,
+        'index_bytes': index.nbytes,
+        # The (day, region) registers are fixed in size; the per-cell sketches grow with the rows
+        'daily_sketch_bytes': sketches.daily.nbytes,
+        'cell_sketch_bytes': sketches.nbytes - sketches.daily.nbytes,
+        'sample_bytes': estimate_size(sample)
+    }
+
+def recommend(probe):
+    """Pick full-load, pushdown or scale-up from the probe numbers, with the reasons"""
+    reasons = []
+    fits = probe['available'] is None or probe['required_bytes'] <= probe['available'] * MEMORY_HEADROOM
+    if not fits:
+        reasons.append(f"needs {format_bytes(probe['required_bytes'])}, more than {MEMORY_HEADROOM:.0%} "
+                       f"of the {format_bytes(probe['available'])} available")
+    if probe['load_seconds'] > LOAD_TARGET_SECONDS:
+        reasons.append(f"a full load takes ~{probe['load_seconds']:.1f}s (target {LOAD_TARGET_SECONDS}s)")
+    if probe['aggregate_seconds'] > INTERACTIVE_SECONDS:
+        reasons.append(f"each filter change takes ~{probe['aggregate_seconds']:.1f}s (target {INTERACTIVE_SECONDS:.0f}s)")
+    
+    if not reasons:
+        return 'full-load', ["the full table fits in memory, loads and aggregates within the targets"]
+    
+    # Pushdown only takes aggregation off the server; the table is loaded either way
+    pushdown = probe.get('pushdown_seconds')
+    if fits and probe['load_seconds'] <= LOAD_TARGET_SECONDS:
+        if pushdown is not None and pushdown <= PUSHDOWN_LATENCY_SECONDS:
+            return 'pushdown', reasons + [f"Supabase answers a dashboard view in {pushdown:.2f}s"]
+    
+    if pushdown is None:
+        reasons.append("database-side queries are unavailable (Supabase or setup.sql functions missing)")
+    elif pushdown > PUSHDOWN_LATENCY_SECONDS:
+        reasons.append(f"Supabase needs {pushdown:.2f}s per dashboard view (target {PUSHDOWN_LATENCY_SECONDS:.0f}s)")
+    return 'scale-up', reasons
+
+STRATEGIES = {
+    'full-load': "Load sales_data into memory (the default; sessions share one frame)",
+    'pushdown': "Configure Supabase with the setup.sql functions: KPIs, charts and detail rows are answered by the "
+                "database (data_layer.SupabaseBackend). The table is still loaded for the date index, sketches and exports",
+    'scale-up': "The dashboard always loads sales_data into memory, and no mode avoids that: use a larger machine, "
+                "lower CACHE_MEMORY_BUDGET_MB, or archive older rows"
+}
+
+def run_capacity_probe(rows=None, max_rows=1000000, pages=5):
+    """Measure this machine and backend against the data volume and print a recommendation"""
+    print("\n⏱️  Capacity probe...")
+    from memory import budget_from_env
+    
+    probe = {'available': available_memory(), 'pushdown_seconds': None}
+    supabase = connect_supabase()
+    backend = None
+    if supabase:
+        try:
+            backend = probe_backend(supabase, pages)
+            probe['pushdown_seconds'] = probe_pushdown(supabase)
+        except Exception as e:
+            print(f"   ⚠️  Supabase probe failed: {str(e)}")
+    if backend is None:
+        print("   ℹ️  Supabase not available; probing with the sample data")
+    
+    template = backend['template'] if backend and len(backend['template']) else sample_template()
+    probe['rows'] = rows or (backend['rows'] if backend else None)
+    if not probe['rows']:
+        if backend:
+            print(f"   ⚠️  sales_data row count unavailable or zero; sizing for the {len(template):,}-row template instead")
+        probe['rows'] = len(template)
+    probe_rows = min(probe['rows'], max_rows)
+    scale = probe['rows'] / probe_rows
+    extrapolated = f" (extrapolated from {probe_rows:,} rows)" if scale > 1 else ""
+    
+    print(f"\n🧠 Memory footprint for {probe['rows']:,} rows{extrapolated}...")
+    memory = probe_memory(template, probe_rows)
+    frame_bytes = memory['frame_bytes'] * scale
+    peak_bytes = memory['peak_bytes'] * scale
+    print(f"   ℹ️  Frame: {format_bytes(frame_bytes)} ({memory['frame_bytes'] / probe_rows:.0f} bytes/row)")
+    print(f"   ℹ️  Peak while loading: {format_bytes(peak_bytes)}")
+    
+    # Built next to the frame for every dataset. The date index depends on days and
+    # cells, not rows, and is copied again once live updates receive an insert.
+    derived = probe_derived(memory['frame'])
+    index_bytes = derived['index_bytes']
+    sketch_bytes = derived['daily_sketch_bytes'] + derived['cell_sketch_bytes'] * scale
+    sample_bytes = derived['sample_bytes'] * scale
+    derived_bytes = 2 * index_bytes + sketch_bytes + sample_bytes
+    print(f"   ℹ️  Date index: {format_bytes(index_bytes)} (twice with live updates)")
+    print(f"   ℹ️  Customer sketches: {format_bytes(sketch_bytes)}")
+    print(f"   ℹ️  Preview sample: {format_bytes(sample_bytes)}")
+    print(f"   ℹ️  Result cache budget (filtered rows, aggregates, exports): {format_bytes(budget_from_env())}")
+    probe['required_bytes'] = max(peak_bytes, frame_bytes + derived_bytes) + budget_from_env()
+    print(f"   ℹ️  Required: {format_bytes(probe['required_bytes'])}")
+    if probe['available'] is not None:
+        print(f"   ℹ️  Available memory: {format_bytes(probe['available'])}")
+    print(f"   ℹ️  CSV parse: {memory['parse_rate']:,.0f} rows/s")
+    
+    fetch_rate = backend['fetch_rate'] if backend else None
+    probe['load_seconds'] = (
+        probe['rows'] / memory['parse_rate'] + (probe['rows'] / fetch_rate if fetch_rate else 0)
+        + derived['seconds'] * scale
+    )
+    print(f"   ℹ️  Estimated full load: {probe['load_seconds']:.1f}s, "
+          f"including {derived['seconds'] * scale:.1f}s for the index, sketches and sample"
+          + ("" if fetch_rate else " (parse only, no fetch)"))
+    
+    print("\n📊 Filter and aggregate pass...")
+    probe['aggregate_seconds'] = probe_aggregates(memory['frame']) * scale
+    print(f"   ℹ️  {probe['aggregate_seconds']:.3f}s per rerun{extrapolated}")
+    
+    strategy, reasons = recommend(probe)
+    print(f"\n💡 Recommendation: {strategy}")
+    print(f"   {STRATEGIES[strategy]}")
+    for reason in reasons:
+        print(f"   - {reason}")
+    return strategy
+
 def print_next_steps(all_checks_passed):
     """Print next steps based on verification results"""
     print("\n" + "="*60)
@@ -155,6 +462,13 @@ def print_next_steps(all_checks_passed):
 
 def main():
     """Run all verification checks"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--probe", action="store_true", help="measure capacity for the current data volume")
+    parser.add_argument("--rows", type=int, help="plan for this many rows instead of the current table size")
+    parser.add_argument("--max-rows", type=int, default=1000000, help="largest synthetic frame to build; larger sizes are extrapolated")
+    parser.add_argument("--pages", type=int, default=5, help="pages of sales_data to fetch for the throughput probe")
+    args = parser.parse_args()
+    
     print("="*60)
     print("🔍 Sales Analytics Dashboard - Installation Verification")
     print("="*60)
@@ -170,6 +484,9 @@ def main():
     check_supabase_connection()
     checks.append(test_data_generation())
     
+    if args.probe and all(checks):
+        run_capacity_probe(args.rows, args.max_rows, args.pages)
+    
     # All required checks must pass
     all_checks_passed = all(checks)
     
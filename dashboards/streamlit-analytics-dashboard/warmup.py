@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Server-Start Warmup
+Preloads the dataset and primes the shared caches when the server starts,
+so the first user does not pay for them.
+
+Set DASHBOARD_API_PORT to also serve the JSON API (api.py) from this
+process, so it shares the dashboard's caches.
+
+Usage (accepts the same options as `streamlit run`):
+    python warmup.py [--server.port 8501 ...]
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parent / "app.py"
+
+
+def warm_caches(log=print):
+    """Load the dataset and fill the caches used by the default dashboard view"""
+    import loaders
+
+    timings = {}
+
+    def step(name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - started
+        log(f"   ✅ {name} ({timings[name]:.2f}s)")
+        return result
+
+    log("🔥 Warming up caches...")
+    step("dataset", loaders.load_data)
+    dimensions = step("filter dimensions", loaders.load_dimensions)
+    min_date, max_date = dimensions['date_bounds']
+    step("default dashboard", loaders.load_dashboard, min_date, max_date, None, None, None)
+    step("date index", loaders.load_date_index)
+    step("fast preview sample", loaders.load_sample)
+    step("customer sketches", loaders.load_customer_sketches)
+
+    step("plotly", prime_plotly)
+    return timings
+
+
+def prime_plotly():
+    """Build one throwaway figure per chart type so Plotly's lazy imports happen now"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    px.line(x=[0, 1], y=[0, 1], template='plotly_white').update_layout(hovermode='x unified')
+    px.bar(x=['a'], y=[1], color=[1], template='plotly_white')
+    px.pie(values=[1], names=['a'], hole=0.4).update_traces(textposition='inside')
+    px.imshow([[0.0, 1.0]], aspect='auto')
+    go.Figure(go.Bar(x=['a'], y=[1])).update_layout(barmode='group')
+
+
+def warm_when_server_ready(poll_interval=0.1, api_port=None):
+    """Wait until the Streamlit runtime exists, then start the API (if asked) and warm the caches"""
+    from streamlit.runtime import Runtime
+
+    while not Runtime.exists():
+        time.sleep(poll_interval)
+
+    if api_port:
+        import api
+        api.start_in_background(os.environ.get("DASHBOARD_API_HOST", "127.0.0.1"), api_port)
+
+    import loaders
+    # Without a script run context, Streamlit would compute the cached loaders but not store them
+    loaders.attach_cache_context()
+    try:
+        warm_caches()
+    except Exception as e:
+        print(f"   ⚠️  Warmup failed: {str(e)}")
+
+
+def main():
+    """Start the warmup thread and run the dashboard with the Streamlit CLI"""
+    from streamlit.web import cli as stcli
+
+    # Loaders import from the app directory, as they do under `streamlit run`
+    sys.path.insert(0, str(APP_PATH.parent))
+    api_port = int(os.environ.get("DASHBOARD_API_PORT", "0") or 0)
+    threading.Thread(
+        target=warm_when_server_ready, kwargs={'api_port': api_port}, name="cache-warmup", daemon=True
+    ).start()
+
+    sys.argv = ["streamlit", "run", str(APP_PATH)] + sys.argv[1:]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()